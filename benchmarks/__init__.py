@@ -0,0 +1,5 @@
+"""Benchmarks for the simulation and drawing hot paths.
+
+Run with ``python -m benchmarks``; see ``python -m benchmarks --help``.
+Cold start time is measured separately with ``python -m benchmarks.startup``.
+"""
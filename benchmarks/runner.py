@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from game import Game
+from utils import draw_status_bars
+from benchmarks.scenarios import SCENARIOS
+
+PHASES = ('update', 'draw_floor', 'draw_game_objects', 'draw_ui', 'draw_status_bars')
+PERCENTILES = (50, 90, 99)
+
+
+def run_scenario(scenario, warmup=30, repetitions=200, seed=1234):
+    """Time each phase of one scenario; returns {phase: [seconds per repetition]}."""
+    game = Game(flock_size=scenario.flock_size, seed=seed)
+    scenario.setup(game)
+    screen = game.screen
+    timings = {phase: [] for phase in PHASES}
+    clock = time.perf_counter
+    for i in range(warmup + repetitions):
+        scenario.tick(game, i)
+        game.renderer.begin()
+
+        start = clock()
+        game.update()
+        updated = clock()
+        game.floor_layer.sync(game.pigeon)
+        floor = clock()
+        game.draw_game_objects(1.0)
+        drawn = clock()
+        game.draw_ui()
+        ui = clock()
+        draw_status_bars(screen, game.pigeon)
+        done = clock()
+
+        if i >= warmup:
+            timings['update'].append(updated - start)
+            timings['draw_floor'].append(floor - updated)
+            timings['draw_game_objects'].append(drawn - floor)
+            timings['draw_ui'].append(ui - drawn)
+            timings['draw_status_bars'].append(done - ui)
+    return timings
+
+
+def summarize(samples):
+    """Summary statistics in milliseconds for a list of timings in seconds."""
+    ms = np.asarray(samples) * 1000
+    summary = {'mean': float(ms.mean()), 'min': float(ms.min()), 'max': float(ms.max())}
+    for q, value in zip(PERCENTILES, np.percentile(ms, PERCENTILES)):
+        summary[f'p{q}'] = float(value)
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_all(names=None, warmup=30, repetitions=200, seed=1234):
+    """Run the selected scenarios (all by default) and return the results document."""
+    results = {
+        'meta': {
+            'commit': git_commit(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'pygame': pygame.version.ver,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'warmup': warmup,
+            'repetitions': repetitions,
+            'seed': seed,
+        },
+        'scenarios': {},
+    }
+    for scenario in SCENARIOS:
+        if names and scenario.name not in names:
+            continue
+        timings = run_scenario(scenario, warmup, repetitions, seed)
+        results['scenarios'][scenario.name] = {
+            'description': scenario.description,
+            'phases': {phase: summarize(samples) for phase, samples in timings.items()},
+        }
+    return results
+
+
+def print_results(results, baseline=None):
+    """Print p50/p99 per phase, with the p50 ratio against a baseline results document if given."""
+    header = f"{'scenario':<16}{'phase':<20}{'p50 ms':>10}{'p99 ms':>10}"
+    print(header + ("   vs base" if baseline else ""))
+    for name, scenario in results['scenarios'].items():
+        for phase, stats in scenario['phases'].items():
+            line = f"{name:<16}{phase:<20}{stats['p50']:>10.3f}{stats['p99']:>10.3f}"
+            base = baseline and baseline['scenarios'].get(name, {}).get('phases', {}).get(phase)
+            if base and base['p50'] > 0:
+                line += f"{stats['p50'] / base['p50']:>9.2f}x"
+            print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the update and draw hot paths on canned scenes")
+    parser.add_argument("scenarios", nargs="*", help="scenario names to run (default: all)")
+    parser.add_argument("--warmup", type=int, default=30, help="untimed ticks before measuring (default: 30)")
+    parser.add_argument("--repetitions", type=int, default=200, help="timed ticks per scenario (default: 200)")
+    parser.add_argument("--seed", type=int, default=1234, help="random seed for every scenario (default: 1234)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="JSON", help="show p50 ratios against an earlier results file")
+    parser.add_argument("--list", action="store_true", help="list the scenarios and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in SCENARIOS:
+            print(f"{scenario.name:<16}{scenario.description}")
+        return
+
+    results = run_all(args.scenarios, args.warmup, args.repetitions, args.seed)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
@@ -0,0 +1,80 @@
+import math
+from collections import namedtuple
+
+# setup(game) builds the scene once; tick(game, i) runs before each measured
+# update to keep the scene in its steady state
+Scenario = namedtuple('Scenario', ['name', 'description', 'setup', 'tick', 'flock_size'])
+
+
+def no_tick(game, i):
+    pass
+
+
+def setup_idle(game):
+    pass
+
+
+def setup_dander(game):
+    game.flock.dander.extend([(game.rng.uniform(30, 770), game.rng.uniform(110, 570)) for _ in range(10000)])
+    game.vacuum_mode = True
+
+
+def tick_vacuum_sweep(game, i):
+    # Back-and-forth sweep across the room, one row of the floor per pass
+    sweep = i % 60
+    x = 40 + (sweep if (i // 60) % 2 == 0 else 59 - sweep) * 12
+    y = 120 + (i // 60) % 10 * 45
+    game.mouse_pos = (x, y)
+    game.mouse_down = True
+
+
+def setup_falling_seeds(game):
+    particles = game.particles
+    for _ in range(5000):
+        x = game.rng.uniform(40, 760)
+        particles.emit_seed(x, game.rng.uniform(-400, 100), 580)
+
+
+def setup_sparkles(game):
+    for _ in range(200):
+        game.particles.emit_sparkle(game.rng.uniform(100, 700), game.rng.uniform(150, 500))
+
+
+def tick_sparkles(game, i):
+    # Sparkles live 20 steps, so ten new ones a step holds about 200 alive
+    for _ in range(10):
+        game.particles.emit_sparkle(game.rng.uniform(100, 700), game.rng.uniform(150, 500))
+
+
+def setup_petting(game):
+    game.pigeon.start_petting()
+
+
+def tick_petting(game, i):
+    if not game.pigeon.being_petted:
+        game.pigeon.start_petting()
+
+
+def setup_ball_chase(game):
+    game.pending_clicks.append(game.play_button.center)
+
+
+def tick_ball_chase(game, i):
+    if not game.ball:
+        game.pending_clicks.append(game.play_button.center)
+
+
+def tick_orbit_mouse(game, i):
+    angle = i / 20
+    game.mouse_pos = (int(400 + math.cos(angle) * 200), int(330 + math.sin(angle) * 150))
+
+
+SCENARIOS = [
+    Scenario('idle', "One pigeon in a clean room", setup_idle, no_tick, 1),
+    Scenario('dander_vacuum', "10k dander with a vacuum sweeping the floor", setup_dander, tick_vacuum_sweep, 1),
+    Scenario('falling_seeds', "5k seeds falling to the floor", setup_falling_seeds, no_tick, 1),
+    Scenario('sparkles', "About 200 sparkles alive at once", setup_sparkles, tick_sparkles, 1),
+    Scenario('petting', "Pigeon held mid-petting, drawn from its cached petted pose", setup_petting, tick_petting, 1),
+    Scenario('ball_chase', "Pigeon chasing and pushing the ball", setup_ball_chase, tick_ball_chase, 1),
+    Scenario('flock_1000', "1000 pigeons wandering one room", setup_idle, tick_orbit_mouse, 1000),
+]
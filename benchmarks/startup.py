@@ -0,0 +1,67 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Runs in a fresh interpreter: import, construct and draw one frame, timing each
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from game import Game
+imported = time.perf_counter()
+game = Game()
+constructed = time.perf_counter()
+game.handle_input()
+game.run_steps(0)
+game.draw()
+drawn = time.perf_counter()
+print(json.dumps({'import': imported - start, 'init': constructed - imported, 'first_frame': drawn - constructed}))
+"""
+PHASES = ('interpreter', 'import', 'init', 'first_frame', 'total')
+
+
+def measure_once(env):
+    """Launch a new process and return seconds spent in each startup phase."""
+    launched = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD], capture_output=True, text=True, check=True,
+                            env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    total = time.perf_counter() - launched
+    phases = json.loads(output.stdout.strip().splitlines()[-1])
+    # Whatever the child didn't account for went to starting the interpreter
+    phases['interpreter'] = total - sum(phases.values())
+    phases['total'] = total
+    return phases
+
+
+def measure(runs=10):
+    """Median and worst time-to-first-frame over runs cold starts, in milliseconds."""
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    samples = [measure_once(env) for _ in range(runs)]
+    return {phase: {'p50': float(np.median([s[phase] for s in samples]) * 1000),
+                    'max': float(max(s[phase] for s in samples) * 1000)}
+            for phase in PHASES}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time from launching a process to the first drawn frame")
+    parser.add_argument("--runs", type=int, default=10, help="cold starts to measure (default: 10)")
+    parser.add_argument("-o", "--output", help="write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    results = measure(args.runs)
+    print(f"{'phase':<14}{'p50 ms':>10}{'max ms':>10}")
+    for phase, stats in results.items():
+        print(f"{phase:<14}{stats['p50']:>10.1f}{stats['max']:>10.1f}")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,114 +1,147 @@
 import pygame
 import random
 import math
+import numpy as np
+from flock import Flock, BODY_HALF_WIDTH, WALK_LEFT, WALK_TOP, WALK_RIGHT, WALK_BOTTOM
+from particles import FEED
+from sprites import sprite_cache
+from text import render_text
+from utils import BASE_RATE
 
 # Colors
-SEED_COLOR = (218, 165, 32)
 BLACK = (0, 0, 0)
-SPARKLE_COLOR = (255, 255, 200)
-
-class FeedingEffect:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.life = 1.0
-        self.particles = []
-        for _ in range(5):
-            angle = random.uniform(0, 2 * math.pi)
-            speed = random.uniform(1, 3)
-            self.particles.append({
-                'dx': math.cos(angle) * speed,
-                'dy': math.sin(angle) * speed,
-                'size': random.uniform(2, 4)
-            })
-
-    def update(self):
-        self.life -= 0.05
-        return self.life > 0
-
-    def draw(self, surface):
-        for particle in self.particles:
-            x = self.x + particle['dx'] * (1 - self.life) * 20
-            y = self.y + particle['dy'] * (1 - self.life) * 20
-            alpha = int(255 * self.life)
-            s = pygame.Surface((int(particle['size'] * 2), int(particle['size'] * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(s, (218, 165, 32, alpha),
-                                (int(particle['size']), int(particle['size'])),
-                                int(particle['size']))
-            surface.blit(s, (int(x - particle['size']), int(y - particle['size'])))
-
-class Sparkle:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.life = 1.0
-        self.speed = random.uniform(1, 3)
-        self.angle = random.uniform(0, 2 * math.pi)
-
-    def update(self):
-        self.life -= 0.05
-        self.x += math.cos(self.angle) * self.speed
-        self.y += math.sin(self.angle) * self.speed
-        return self.life > 0
-
-    def draw(self, surface):
-        alpha = int(255 * self.life)
-        color = (*SPARKLE_COLOR, alpha)
-        s = pygame.Surface((5, 5), pygame.SRCALPHA)
-        pygame.draw.circle(s, color, (2, 2), 2)
-        surface.blit(s, (int(self.x), int(self.y)))
-
-class SeedParticle:
-    def __init__(self, x, y, target_y):
-        self.x = x
-        self.y = y
-        self.target_y = target_y
-        self.fall_speed = random.uniform(2, 4)
-        self.falling = True
-        self.rotation = random.uniform(0, 360)
-        self.spin_speed = random.uniform(-5, 5)
-        self.scale = random.uniform(0.8, 1.2)
-        self.being_eaten = False
-        self.fade_alpha = 255
-
-    def update(self):
-        if self.being_eaten:
-            self.fade_alpha = max(0, self.fade_alpha - 15)  # Fade out when being eaten
-            return self.fade_alpha > 0
-        elif self.falling:
-            self.y += self.fall_speed
-            self.rotation += self.spin_speed
-            if self.y >= self.target_y:
-                self.y = self.target_y
-                self.falling = False
-        return True
-
-    def draw(self, surface):
-        seed_size = 3 * self.scale
-        points = [
-            (self.x + math.cos(math.radians(self.rotation)) * seed_size,
-             self.y + math.sin(math.radians(self.rotation)) * seed_size),
-            (self.x + math.cos(math.radians(self.rotation + 120)) * seed_size,
-             self.y + math.sin(math.radians(self.rotation + 120)) * seed_size),
-            (self.x + math.cos(math.radians(self.rotation + 240)) * seed_size,
-             self.y + math.sin(math.radians(self.rotation + 240)) * seed_size)
-        ]
-
-        if self.being_eaten:
-            s = pygame.Surface((seed_size * 4, seed_size * 4), pygame.SRCALPHA)
-            pygame.draw.polygon(s, (*SEED_COLOR, self.fade_alpha), [
-                (p[0] - self.x + seed_size * 2, p[1] - self.y + seed_size * 2) for p in points
-            ])
-            surface.blit(s, (self.x - seed_size * 2, self.y - seed_size * 2))
-        else:
-            pygame.draw.polygon(surface, SEED_COLOR, points)
+
+# Everything a pigeon says; Game.prewarm() renders PIGEON_MESSAGES before the first frame
+IDLE_MESSAGE = "Just chilling..."
+ACTION_MESSAGES = {
+    "drop": "Oops, a dropping!",
+    "frolic": "Fluffing feathers!",
+    "coo": "Cooing softly...",
+    "loaf": "Just loafing around.",
+    "eat": "Looking for seeds...",
+    "hop": "Hop hop!",
+}
+EATING_MESSAGE = "Nom nom nom..."
+FED_MESSAGE = "Yum!"
+PLAY_MESSAGE = "Time to play!"
+PLAYED_MESSAGE = "That was fun!"
+PETTED_MESSAGE = "Coo! Thanks for the pet!"
+WELCOME_MESSAGE = "Welcome back!"
+BALL_MESSAGES = ("Boop!", "Play with me!", "This is fun!", "Chase the ball!")
+PIGEON_MESSAGES = (
+    IDLE_MESSAGE, *ACTION_MESSAGES.values(), EATING_MESSAGE, FED_MESSAGE, PLAY_MESSAGE,
+    PLAYED_MESSAGE, PETTED_MESSAGE, WELCOME_MESSAGE, *BALL_MESSAGES,
+)
+
+
+def sample_binomial(n, p, rng=random):
+    """Draw the number of successes in n trials of probability p."""
+    if n < 100:
+        return sum(1 for _ in range(n) if rng.random() < p)
+    # Normal approximation is indistinguishable at this size and costs O(1)
+    mean = n * p
+    count = round(rng.gauss(mean, math.sqrt(mean * (1 - p))))
+    return min(n, max(0, count))
+
+
+POSE_PHASES = 16         # Animation phases pre-rendered per cycle
+POSE_SIZE = (102, 130)   # Pose sprite size, covering the eating bob and the legs
+POSE_ORIGIN = (51, 56)   # Where the pigeon's centre sits in its pose sprite
+
+
+def quantize_phase(phase):
+    """Round an animation phase to the nearest of POSE_PHASES steps per 2*pi cycle."""
+    step = round(phase * POSE_PHASES / (2 * math.pi)) % POSE_PHASES
+    return step * 2 * math.pi / POSE_PHASES
+
+
+def prewarm_poses():
+    """Render every pigeon pose into the sprite cache."""
+    phases = [step * 2 * math.pi / POSE_PHASES for step in range(POSE_PHASES)]
+    for petted in (False, True):
+        for eating_phase, leg_phase in ([(None, None)] + [(phase, None) for phase in phases]
+                                        + [(None, phase) for phase in phases]):
+            sprite_cache.pose(('pigeon', eating_phase, petted, leg_phase), POSE_SIZE,
+                              lambda s: paint_pigeon(s, POSE_ORIGIN[0], POSE_ORIGIN[1],
+                                                     eating_phase, petted, leg_phase))
+
+
+def paint_pigeon(surface, x, y, eating_phase=None, petted=False, leg_phase=None):
+    """Draw a pigeon pose from primitives, centred on (x, y).
+
+    eating_phase is None unless the pigeon is eating, and leg_phase is None
+    unless it is walking. Used to fill the pose cache; Pigeon.draw blits
+    the cached sprites instead.
+    """
+    bob_offset = 0
+
+    if eating_phase is not None:
+        # Eating animation
+        bob_offset = math.sin(eating_phase) * 5
+        pygame.draw.circle(surface, (150, 150, 150), 
+                             (int(x), int(y + bob_offset)), 50)
+
+        # Animate beak during eating
+        beak_open = math.sin(eating_phase * 2) * 10
+        pygame.draw.polygon(surface, (255, 200, 0),
+                              [(int(x), int(y + bob_offset)),
+                               (int(x) + 30, int(y + bob_offset) + 10 - beak_open),
+                               (int(x), int(y + bob_offset) + 20)])
+    else:
+        # Normal drawing
+        pygame.draw.circle(surface, (150, 150, 150), (int(x), int(y)), 50)
+        pygame.draw.polygon(surface, (255, 200, 0),
+                              [(int(x), int(y)),
+                               (int(x) + 30, int(y) + 10),
+                               (int(x), int(y) + 20)])
+
+    # Draw eyes based on state
+    if petted:
+        # Happy closed eyes (^ ^)
+        eye_y = y + bob_offset - 10
+        # Left eye
+        start_l = (int(x) - 20, int(eye_y))
+        end_l = (int(x) - 10, int(eye_y))
+        control_l = (int(x) - 15, int(eye_y) - 5)
+        # Right eye
+        start_r = (int(x) + 10, int(eye_y))
+        end_r = (int(x) + 20, int(eye_y))
+        control_r = (int(x) + 15, int(eye_y) - 5)
+
+        # Draw curved lines for happy eyes
+        for i in range(0, 10):
+            t = i / 10
+            # Left eye
+            x1 = (1-t)**2 * start_l[0] + 2*(1-t)*t*control_l[0] + t**2*end_l[0]
+            y1 = (1-t)**2 * start_l[1] + 2*(1-t)*t*control_l[1] + t**2*end_l[1]
+            # Right eye
+            x2 = (1-t)**2 * start_r[0] + 2*(1-t)*t*control_r[0] + t**2*end_r[0]
+            y2 = (1-t)**2 * start_r[1] + 2*(1-t)*t*control_r[1] + t**2*end_r[1]
+
+            pygame.draw.circle(surface, (0, 0, 0), (int(x1), int(y1)), 1)
+            pygame.draw.circle(surface, (0, 0, 0), (int(x2), int(y2)), 1)
+    else:
+        # Normal eyes
+        pygame.draw.circle(surface, (0, 0, 0), (int(x) - 15, int(y + bob_offset) - 10), 5)
+        pygame.draw.circle(surface, (0, 0, 0), (int(x) + 15, int(y + bob_offset) - 10), 5)
+
+    if leg_phase is not None:
+        offset = int(10 * math.sin(leg_phase))
+        left_start = (int(x) - 15, int(y) + 50)
+        left_end = (int(x) - 15 + offset, int(y) + 70)
+        pygame.draw.line(surface, (0, 0, 0), left_start, left_end, 3)
+        right_start = (int(x) + 15, int(y) + 50)
+        right_end = (int(x) + 15 - offset, int(y) + 70)
+        pygame.draw.line(surface, (0, 0, 0), right_start, right_end, 3)
+
 
 class Ball:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.dx = random.uniform(-3, 3)
-        self.dy = random.uniform(-3, 3)
+    def __init__(self, x, y, clock=None, rng=random):
+        self.clock = clock or pygame.time.get_ticks
+        self.x = self.prev_x = x
+        self.y = self.prev_y = y
+        self.dx = rng.uniform(-3, 3)
+        self.dy = rng.uniform(-3, 3)
         self.radius = 10
         self.color = (255, 0, 0)  # Red ball
         self.being_pushed = False
@@ -116,11 +149,14 @@ class Ball:
         self.push_duration = 2000  # 2 seconds of pushing
         self.push_decay = 0.95  # Decay rate for push force
 
-    def update(self, width, height, wall_thickness):
+    def update(self, width, height, wall_thickness, dt=1 / BASE_RATE):
         """Update ball position and handle bouncing."""
+        steps = dt * BASE_RATE
+        self.prev_x, self.prev_y = self.x, self.y
+
         # Update position
-        self.x += self.dx
-        self.y += self.dy
+        self.x += self.dx * steps
+        self.y += self.dy * steps
 
         # Bounce off walls with energy loss
         bounce_damping = 0.8  # Reduce velocity on bounce
@@ -139,8 +175,9 @@ class Ball:
             self.dy = -abs(self.dy) * bounce_damping
 
         # Apply friction
-        self.dx *= 0.99
-        self.dy *= 0.99
+        friction = 0.99 ** steps
+        self.dx *= friction
+        self.dy *= friction
 
         # Stop very slow movement
         if abs(self.dx) < 0.1: self.dx = 0
@@ -148,112 +185,209 @@ class Ball:
 
         # Check if we should still be in "pushed" state
         if self.being_pushed:
-            current_time = pygame.time.get_ticks()
+            current_time = self.clock()
             if current_time - self.push_timer >= self.push_duration:
                 self.being_pushed = False
 
-    def draw(self, surface):
+    def draw(self, surface, alpha=1.0):
         """Draw the ball with shadow effect."""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
         # Draw shadow
         shadow_offset = 4
         pygame.draw.circle(surface, (100, 100, 100), 
-                             (int(self.x + shadow_offset), int(self.y + shadow_offset)), 
+                             (int(x + shadow_offset), int(y + shadow_offset)), 
                              self.radius)
         # Draw ball
-        pygame.draw.circle(surface, self.color, (int(self.x), int(self.y)), self.radius)
+        pygame.draw.circle(surface, self.color, (int(x), int(y)), self.radius)
         # Draw highlight
-        highlight_pos = (int(self.x - self.radius/3), int(self.y - self.radius/3))
+        highlight_pos = (int(x - self.radius/3), int(y - self.radius/3))
         pygame.draw.circle(surface, (255, 200, 200), highlight_pos, 3)
 
+    def bounds(self, alpha=1.0):
+        """Screen rect covering what draw() paints at this alpha, shadow included."""
+        x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        return pygame.Rect(x - self.radius - 1, y - self.radius - 1, self.radius * 2 + 7, self.radius * 2 + 7)
 
-class Pigeon:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.dx = 2
-        self.dy = 0
-        self.health = 100
-        self.happiness = 100
-        self.hunger = 0
-        self.cleanliness = 100
-        self.energy = 100
-        self.action = "idle"
-        self.action_message = "Just chilling..."
-        self.last_action_time = pygame.time.get_ticks()
-        self.leg_phase = 0
-        self.feeding_effects = []
-        self.dander = []
-        self.droppings = []
-        # Eating-related attributes
-        self.is_eating = False
-        self.eating_time = 0
-        self.eating_duration = 800  # 0.8 seconds per seed
-        self.eating_animation_phase = 0
-        self.target_seed = None
-        # Petting-related attributes
-        self.being_petted = False
-        self.pet_time = 0
-        self.pet_duration = 1000  # 1 second of happy animation
-        self.pet_animation_phase = 0
-        self.playing_with_ball = False
-        self.play_start_time = 0
-        self.play_duration = 5000  # 5 seconds of playing
-        self.target_ball = None
 
-    def update(self):
-        now = pygame.time.get_ticks()
+class Column:
+    """Pigeon attribute kept in one of its flock's columns."""
+    def __set_name__(self, owner, name):
+        self.name = name
 
-        # Handle petting animation
-        if self.being_petted:
-            self.pet_animation_phase += 0.2
-            if now - self.pet_time >= self.pet_duration:
-                self.being_petted = False
-                self.pet_animation_phase = 0
+    def __get__(self, pigeon, owner=None):
+        if pigeon is None:
+            return self
+        return getattr(pigeon.flock, self.name).item(pigeon.row)
 
-        # Only update stats if not eating
-        if not self.is_eating:
-            self.hunger = min(100, self.hunger + 0.02)  # Reduced from 0.1
-            self.energy = max(0, self.energy - 0.01)    # Reduced from 0.05
-            self.cleanliness = max(0, self.cleanliness - 0.015)  # Reduced from 0.1
-            self.happiness = max(0, self.happiness - 0.01)  # Gradual decrease in happiness
+    def __set__(self, pigeon, value):
+        getattr(pigeon.flock, self.name)[pigeon.row] = value
 
-        self.update_feeding_effects()
 
-        if self.is_eating:
-            self.eating_animation_phase += 0.2
-            if now - self.eating_time >= self.eating_duration:
+class ObjectColumn(Column):
+    """Pigeon attribute kept in one of its flock's lists."""
+    def __get__(self, pigeon, owner=None):
+        if pigeon is None:
+            return self
+        return getattr(pigeon.flock, self.name)[pigeon.row]
+
+
+class FlockAttribute:
+    """Read-only pigeon attribute shared by the whole flock."""
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, pigeon, owner=None):
+        if pigeon is None:
+            return getattr(Flock, self.name, self)  # Class-level access gives the default
+        return getattr(pigeon.flock, self.name)
+
+
+class Pigeon:
+    """One pigeon, as a view over its row in a flock.Flock.
+
+    Pigeons built without a flock get a flock of their own, so single-bird
+    code keeps working unchanged.
+    """
+    __slots__ = ('flock', 'row')
+
+    # Behaviour constants are shared by the flock
+    hunger_rate = FlockAttribute()
+    energy_decay = FlockAttribute()
+    cleanliness_decay = FlockAttribute()
+    happiness_decay = FlockAttribute()
+    action_interval = FlockAttribute()
+    eating_duration = FlockAttribute()
+    pet_duration = FlockAttribute()
+    play_duration = FlockAttribute()
+
+    x = Column()
+    y = Column()
+    prev_x = Column()
+    prev_y = Column()
+    dx = Column()
+    dy = Column()
+    health = Column()
+    happiness = Column()
+    hunger = Column()
+    cleanliness = Column()
+    energy = Column()
+    last_action_time = Column()
+    leg_phase = Column()
+    # Eating-related attributes
+    is_eating = Column()
+    eating_time = Column()
+    eating_animation_phase = Column()
+    target_seed = ObjectColumn()
+    target_slot = Column()
+    # Petting-related attributes
+    being_petted = Column()
+    pet_time = Column()
+    pet_animation_phase = Column()
+    playing_with_ball = Column()
+    play_start_time = Column()
+    target_ball = ObjectColumn()
+    action = ObjectColumn()
+    action_message = ObjectColumn()
+
+    clock = FlockAttribute()
+    rng = FlockAttribute()
+    particles = FlockAttribute()
+    dander = FlockAttribute()
+    droppings = FlockAttribute()
+
+    def __init__(self, x, y, clock=None, particles=None, flock=None):
+        self.flock = flock if flock is not None else Flock(clock, particles)
+        self.row = self.flock.add(self, x, y)
+        self.action_message = IDLE_MESSAGE
+
+    def rebind(self, flock):
+        """Return a view of the same row in another flock, such as a copy of this one."""
+        view = Pigeon.__new__(Pigeon)
+        view.flock = flock
+        view.row = self.row
+        return view
+
+    def update(self, dt=1 / BASE_RATE):
+        # Small flocks step one row at a time, so this reads and writes the
+        # row's columns directly with plain floats instead of going through
+        # the descriptors, which cost several times as much per access
+        flock = self.flock
+        row = self.row
+        now = flock.clock()
+        steps = dt * BASE_RATE
+        xs, ys = flock.x, flock.y
+        x, y = xs.item(row), ys.item(row)
+        flock.prev_x[row] = x
+        flock.prev_y[row] = y
+
+        # Handle petting animation
+        if flock.being_petted.item(row):
+            flock.pet_animation_phase[row] += 0.2 * steps
+            if now - flock.pet_time.item(row) >= flock.pet_duration:
+                flock.being_petted[row] = False
+                flock.pet_animation_phase[row] = 0
+
+        # Only update stats if not eating
+        if flock.is_eating.item(row):
+            flock.eating_animation_phase[row] += 0.2 * steps
+            if now - flock.eating_time.item(row) >= flock.eating_duration:
                 self.finish_eating()
             return  # Don't move while eating
 
-        # Handle playing state
-        if self.playing_with_ball:
-            if now - self.play_start_time >= self.play_duration:
-                self.playing_with_ball = False
-                self.target_ball = None
-                self.action_message = "That was fun!"
-                self.happiness = min(100, self.happiness + 20)  # Big happiness boost when finishing play session
-            elif self.target_ball:
-                self.chase_ball(self.target_ball)
-                # Small continuous happiness boost while playing
-                self.happiness = min(100, self.happiness + 0.05)
-
-        if self.dx != 0 or self.dy != 0:
-            self.leg_phase += 0.2
-
-        if now - self.last_action_time > 3000:
+        # Stats only drift while not eating
+        column = flock.hunger
+        column[row] = min(100, column.item(row) + flock.hunger_rate * steps)
+        column = flock.energy
+        column[row] = max(0, column.item(row) - flock.energy_decay * steps)
+        column = flock.cleanliness
+        column[row] = max(0, column.item(row) - flock.cleanliness_decay * steps)
+        column = flock.happiness
+        column[row] = max(0, column.item(row) - flock.happiness_decay * steps)  # Gradual decrease in happiness
+
+        if flock.playing_with_ball.item(row):
+            self.update_play(now, steps)
+
+        dxs, dys = flock.dx, flock.dy
+        dx, dy = dxs.item(row), dys.item(row)
+        if dx != 0 or dy != 0:
+            column = flock.leg_phase
+            column[row] = column.item(row) + 0.2 * steps
+
+        if now - flock.last_action_time.item(row) > flock.action_interval:
             self.choose_action()
-            self.last_action_time = now
-
-        if self.dx != 0 or self.dy != 0:
-            self.move()
+            flock.last_action_time[row] = now
+            dx, dy = dxs.item(row), dys.item(row)
+
+        # Move and bounce off the walls; Flock.move does the same for whole flocks
+        if dx != 0 or dy != 0:
+            xs[row] = x = xs.item(row) + dx * steps
+            ys[row] = y = ys.item(row) + dy * steps
+            if x - BODY_HALF_WIDTH <= WALK_LEFT or x + BODY_HALF_WIDTH >= WALK_RIGHT:
+                dxs[row] = -dx
+            if y - BODY_HALF_WIDTH <= WALK_TOP or y + BODY_HALF_WIDTH >= WALK_BOTTOM:
+                dys[row] = -dy
+
+    def update_play(self, now, steps):
+        """Handle playing state."""
+        if now - self.play_start_time >= self.play_duration:
+            self.playing_with_ball = False
+            self.target_ball = None
+            self.action_message = PLAYED_MESSAGE
+            self.happiness = min(100, self.happiness + 20)  # Big happiness boost when finishing play session
+        elif self.target_ball:
+            self.chase_ball(self.target_ball)
+            # Small continuous happiness boost while playing
+            self.happiness = min(100, self.happiness + 0.05 * steps)
 
     def finish_eating(self):
         """Reset eating state and resume normal behavior."""
         self.is_eating = False
         self.target_seed = None
         self.eating_animation_phase = 0
-        self.action_message = "Yum!"
-        self.dx = random.choice([-1, 1])  # Resume random movement
+        self.action_message = FED_MESSAGE
+        self.dx = self.rng.choice([-1, 1])  # Resume random movement
         self.dy = 0
 
     def move_towards_seed(self, seed_pos):
@@ -274,162 +408,154 @@ class Pigeon:
             return  # Don't start eating if already eating
 
         self.is_eating = True
-        self.eating_time = pygame.time.get_ticks()
+        self.eating_time = self.clock()
         self.dx = 0
         self.dy = 0
-        self.action_message = "Nom nom nom..."
+        self.action_message = EATING_MESSAGE
         self.target_seed = seed_pos
 
-    def draw(self, surface):
-        """Draw the pigeon with its body, face, and animated legs if moving."""
-        bob_offset = 0
-
+    def pose(self):
+        """The cached sprite for this pigeon's current pose."""
+        eating_phase = leg_phase = None
         if self.is_eating:
-            # Eating animation
-            bob_offset = math.sin(self.eating_animation_phase) * 5
-            pygame.draw.circle(surface, (150, 150, 150), 
-                                 (int(self.x), int(self.y + bob_offset)), 50)
-
-            # Animate beak during eating
-            beak_open = math.sin(self.eating_animation_phase * 2) * 10
-            pygame.draw.polygon(surface, (255, 200, 0),
-                                  [(int(self.x), int(self.y + bob_offset)),
-                                   (int(self.x) + 30, int(self.y + bob_offset) + 10 - beak_open),
-                                   (int(self.x), int(self.y + bob_offset) + 20)])
-        else:
-            # Normal drawing
-            pygame.draw.circle(surface, (150, 150, 150), (int(self.x), int(self.y)), 50)
-            pygame.draw.polygon(surface, (255, 200, 0),
-                                  [(int(self.x), int(self.y)),
-                                   (int(self.x) + 30, int(self.y) + 10),
-                                   (int(self.x), int(self.y) + 20)])
-
-        # Draw eyes based on state
-        if self.being_petted:
-            # Happy closed eyes (^ ^)
-            eye_y = self.y + bob_offset - 10
-            # Left eye
-            start_l = (int(self.x) - 20, int(eye_y))
-            end_l = (int(self.x) - 10, int(eye_y))
-            control_l = (int(self.x) - 15, int(eye_y) - 5)
-            # Right eye
-            start_r = (int(self.x) + 10, int(eye_y))
-            end_r = (int(self.x) + 20, int(eye_y))
-            control_r = (int(self.x) + 15, int(eye_y) - 5)
-
-            # Draw curved lines for happy eyes
-            for i in range(0, 10):
-                t = i / 10
-                # Left eye
-                x1 = (1-t)**2 * start_l[0] + 2*(1-t)*t*control_l[0] + t**2*end_l[0]
-                y1 = (1-t)**2 * start_l[1] + 2*(1-t)*t*control_l[1] + t**2*end_l[1]
-                # Right eye
-                x2 = (1-t)**2 * start_r[0] + 2*(1-t)*t*control_r[0] + t**2*end_r[0]
-                y2 = (1-t)**2 * start_r[1] + 2*(1-t)*t*control_r[1] + t**2*end_r[1]
-
-                pygame.draw.circle(surface, (0, 0, 0), (int(x1), int(y1)), 1)
-                pygame.draw.circle(surface, (0, 0, 0), (int(x2), int(y2)), 1)
-        else:
-            # Normal eyes
-            pygame.draw.circle(surface, (0, 0, 0), (int(self.x) - 15, int(self.y + bob_offset) - 10), 5)
-            pygame.draw.circle(surface, (0, 0, 0), (int(self.x) + 15, int(self.y + bob_offset) - 10), 5)
-
-        if self.dx != 0 or self.dy != 0:
-            offset = int(10 * math.sin(self.leg_phase))
-            left_start = (int(self.x) - 15, int(self.y) + 50)
-            left_end = (int(self.x) - 15 + offset, int(self.y) + 70)
-            pygame.draw.line(surface, (0, 0, 0), left_start, left_end, 3)
-            right_start = (int(self.x) + 15, int(self.y) + 50)
-            right_end = (int(self.x) + 15 - offset, int(self.y) + 70)
-            pygame.draw.line(surface, (0, 0, 0), right_start, right_end, 3)
-
-        # Display action message above the pigeon
-        font = pygame.font.Font(None, 24)
-        text = font.render(self.action_message, True, (0, 0, 0))
-        surface.blit(text, (int(self.x) - text.get_width() // 2, int(self.y) - 70))
+            eating_phase = quantize_phase(self.eating_animation_phase)
+        elif self.dx != 0 or self.dy != 0:
+            leg_phase = quantize_phase(self.leg_phase)
+        petted = bool(self.being_petted)
+        return sprite_cache.pose(('pigeon', eating_phase, petted, leg_phase), POSE_SIZE,
+                                 lambda s: paint_pigeon(s, POSE_ORIGIN[0], POSE_ORIGIN[1],
+                                                        eating_phase, petted, leg_phase))
+
+    def draw(self, surface, alpha=1.0):
+        """Draw the pigeon's cached pose sprite and its action message."""
+        x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        text = render_text(self.action_message, 24, (0, 0, 0))
+        surface.blits((
+            (self.pose(), (x - POSE_ORIGIN[0], y - POSE_ORIGIN[1])),
+            (text, (x - text.get_width() // 2, y - 70)),
+        ), doreturn=False)
+
+    def bounds(self, alpha=1.0):
+        """Screen rect covering what draw() paints at this alpha."""
+        x = int(self.prev_x + (self.x - self.prev_x) * alpha)
+        y = int(self.prev_y + (self.y - self.prev_y) * alpha)
+        body = pygame.Rect(x - 51, y - 56, 102, 130)  # Body with eating bob, down to the legs
+        text = render_text(self.action_message, 24, (0, 0, 0))
+        return body.union(text.get_rect(topleft=(x - text.get_width() // 2, y - 70)))
 
     def choose_action(self):
         actions = ["drop", "frolic", "coo", "loaf", "eat", "hop"]
-        self.action = random.choice(actions)
+        self.action = self.rng.choice(actions)
+        self.action_message = ACTION_MESSAGES[self.action]
         if self.action == "drop":
-            self.action_message = "Oops, a dropping!"
             self.add_dropping()
-            self.dx = random.choice([-1, 1]) * random.randint(1, 3)
-            self.dy = random.choice([-1, 1]) * random.randint(1, 2)
+            self.dx = self.rng.choice([-1, 1]) * self.rng.randint(1, 3)
+            self.dy = self.rng.choice([-1, 1]) * self.rng.randint(1, 2)
         elif self.action == "frolic":
-            self.action_message = "Fluffing feathers!"
             self.add_dander()
-            self.dx = random.choice([-1, 1]) * random.randint(2, 4)
-            self.dy = random.choice([-1, 1]) * random.randint(1, 3)
+            self.dx = self.rng.choice([-1, 1]) * self.rng.randint(2, 4)
+            self.dy = self.rng.choice([-1, 1]) * self.rng.randint(1, 3)
         elif self.action == "coo":
-            self.action_message = "Cooing softly..."
-            self.dx = random.choice([-1, 1]) * random.randint(1, 2)
+            self.dx = self.rng.choice([-1, 1]) * self.rng.randint(1, 2)
             self.dy = 0
         elif self.action == "loaf":
-            self.action_message = "Just loafing around."
             self.dx = 0
             self.dy = 0
         elif self.action == "eat":
-            self.action_message = "Looking for seeds..." #Changed message
             self.dx = 0
             self.dy = 0
             #Find nearest seed
             #self.start_eating(nearest_seed_pos) #This line needs more info
         elif self.action == "hop":
-            self.action_message = "Hop hop!"
-            self.dx = random.choice([-1, 1]) * 2
+            self.dx = self.rng.choice([-1, 1]) * 2
             self.dy = -4
 
     def add_dander(self):
         """Add a burst of dander particles near the pigeon's current position."""
+        burst = []
         for _ in range(10):
-            x = self.x + random.randint(-30, 30)
-            y = self.y + random.randint(-30, 30)
-            self.dander.append((x, y))
+            x = self.x + self.rng.randint(-30, 30)
+            y = self.y + self.rng.randint(-30, 30)
+            burst.append((x, y))
+        self.dander.extend(burst)
 
     def add_dropping(self):
         """Add a dropping particle near the pigeon's current position."""
-        x = self.x + random.randint(-20, 20)
-        y = self.y + random.randint(20, 40)
+        x = self.x + self.rng.randint(-20, 20)
+        y = self.y + self.rng.randint(20, 40)
         self.droppings.append((x, y))
 
-    def eat_seed(self, seed_pos, seed_object):
+    def catch_up(self, elapsed):
+        """Apply elapsed ms of unattended time in one go instead of replaying every step.
+
+        Stats drift linearly until they hit their limits, so they are applied in
+        closed form; the droppings and dander from the choose_action calls that
+        would have happened are sampled in bulk.
+        """
+        if self.is_eating:
+            self.finish_eating()
+        self.being_petted = False
+        self.pet_animation_phase = 0
+        if self.playing_with_ball:
+            self.playing_with_ball = False
+            self.target_ball = None
+            self.happiness = min(100, self.happiness + 20)
+        self.particles.release(self.particles.slots(FEED))
+
+        steps = elapsed / 1000 * BASE_RATE
+        self.hunger = min(100, self.hunger + self.hunger_rate * steps)
+        self.energy = max(0, self.energy - self.energy_decay * steps)
+        self.cleanliness = max(0, self.cleanliness - self.cleanliness_decay * steps)
+        self.happiness = max(0, self.happiness - self.happiness_decay * steps)
+
+        # choose_action picks uniformly from six actions: "drop" leaves one
+        # dropping and "frolic" leaves a burst of ten dander
+        actions = int(elapsed // self.action_interval)
+        drops = sample_binomial(actions, 1 / 6, self.rng)
+        frolics = sample_binomial(actions - drops, 1 / 5, self.rng)
+        rng = np.random.default_rng(self.rng.getrandbits(64))
+        spots = self.random_positions(rng, drops)
+        spots[:, 0] += rng.integers(-20, 21, drops)
+        spots[:, 1] += rng.integers(20, 41, drops)
+        self.droppings.extend(spots)
+        spots = np.repeat(self.random_positions(rng, frolics), 10, axis=0)
+        spots += rng.integers(-30, 31, (frolics * 10, 2))
+        self.dander.extend(spots)
+
+        self.last_action_time = self.clock()
+        if actions:
+            self.action_message = WELCOME_MESSAGE
+
+    def random_positions(self, rng, count):
+        """Pick count random spots the pigeon can wander to inside the walls."""
+        return rng.uniform((70, 70), (730, 450), (count, 2))
+
+    def eat_seed(self, seed_pos, seed_slot):
+        """Eat the seed in particle slot seed_slot."""
         self.hunger = max(0, self.hunger - 10)  # Reduce hunger
         self.happiness = min(100, self.happiness + 5)  # Small happiness boost from eating
-        self.feeding_effects.append(FeedingEffect(seed_pos[0], seed_pos[1]))
+        self.particles.emit_feeding(seed_pos[0], seed_pos[1])
         self.start_eating(seed_pos)
-        seed_object.being_eaten = True
-
-    def update_feeding_effects(self):
-        self.feeding_effects = [effect for effect in self.feeding_effects if effect.update()]
+        self.particles.eat_seed(seed_slot)
 
     def draw_feeding_effects(self, surface):
-        for effect in self.feeding_effects:
-            effect.draw(surface)
-
-
-    def move(self):
-        self.x += self.dx
-        self.y += self.dy
-        if self.x - 50 <= 20 or self.x + 50 >= 780:
-            self.dx = -self.dx
-        if self.y - 50 <= 20 or self.y + 50 >= 500:
-            self.dy = -self.dy
+        surface.blits(self.particles.sprites(FEED), doreturn=False)
 
     def start_playing(self, ball):
         """Start playing with a ball."""
         self.playing_with_ball = True
-        self.play_start_time = pygame.time.get_ticks()
+        self.play_start_time = self.clock()
         self.target_ball = ball
-        self.action_message = "Time to play!"
+        self.action_message = PLAY_MESSAGE
         self.happiness = min(100, self.happiness + 15)  # Initial happiness boost when starting to play
 
     def start_petting(self):
         """Start the petting animation."""
         self.being_petted = True
-        self.pet_time = pygame.time.get_ticks()
+        self.pet_time = self.clock()
         self.pet_animation_phase = 0
-        self.action_message = "Coo! Thanks for the pet!"
+        self.action_message = PETTED_MESSAGE
         self.happiness = min(100, self.happiness + 25)  # Major happiness boost from petting
 
     def chase_ball(self, ball):
@@ -454,7 +580,7 @@ class Pigeon:
                 push_angle = math.atan2(dy, dx)
 
                 # Add some randomness to push direction
-                push_angle += random.uniform(-0.5, 0.5)
+                push_angle += self.rng.uniform(-0.5, 0.5)
 
                 # Apply push force to ball
                 ball.dx = math.cos(push_angle) * push_force
@@ -466,12 +592,7 @@ class Pigeon:
                 self.dy = -math.sin(push_angle) * recoil
 
                 ball.being_pushed = True
-                ball.push_timer = pygame.time.get_ticks()
+                ball.push_timer = self.clock()
 
                 # Add some "playful" randomness to pigeon's next move
-                self.action_message = random.choice([
-                    "Boop!", 
-                    "Play with me!",
-                    "This is fun!",
-                    "Chase the ball!"
-                ])
\ No newline at end of file
+                self.action_message = self.rng.choice(BALL_MESSAGES)
\ No newline at end of file
@@ -1,30 +1,100 @@
+import heapq
+import itertools
 import random
+from collections import namedtuple
+
+# rate is the average number of firings per second for each pigeon
+EventType = namedtuple('EventType', ['rate', 'message', 'handler'])
+
+
+def find_coin(pigeon, rng):
+    pigeon.happiness = min(100, pigeon.happiness + 15)
+
+
+def get_spooked(pigeon, rng):
+    pigeon.happiness = max(0, pigeon.happiness - 10)
+    pigeon.dx = rng.randint(-5, 5)
+    pigeon.dy = rng.randint(-5, 5)
+
+
+def make_friend(pigeon, rng):
+    pigeon.happiness = min(100, pigeon.happiness + 20)
+
+
+def take_nap(pigeon, rng):
+    pigeon.energy = min(100, pigeon.energy + 30)
+
+
+# The old per-call chances, spread over the pigeon's 3 second action interval
+EVENTS = {
+    'find_coin': EventType(0.05 / 3, 'Your pigeon found a shiny coin!', find_coin),
+    'get_spooked': EventType(0.1 / 3, 'A loud noise spooked your pigeon!', get_spooked),
+    'make_friend': EventType(0.03 / 3, 'Your pigeon made a friend!', make_friend),
+    'take_nap': EventType(0.08 / 3, 'Your pigeon took a quick nap!', take_nap),
+}
+
 
 class EventManager:
-    def __init__(self):
-        self.events = {
-            'find_coin': {'chance': 0.05, 'message': 'Your pigeon found a shiny coin!'},
-            'get_spooked': {'chance': 0.1, 'message': 'A loud noise spooked your pigeon!'},
-            'make_friend': {'chance': 0.03, 'message': 'Your pigeon made a friend!'},
-            'take_nap': {'chance': 0.08, 'message': 'Your pigeon took a quick nap!'}
-        }
-        
-    def check_events(self, pigeon):
-        triggered_events = []
-        for event_name, event_data in self.events.items():
-            if random.random() < event_data['chance']:
-                self.handle_event(event_name, pigeon)
-                triggered_events.append(event_data['message'])
-        return triggered_events
-    
-    def handle_event(self, event_name, pigeon):
-        if event_name == 'find_coin':
-            pigeon.happiness = min(100, pigeon.happiness + 15)
-        elif event_name == 'get_spooked':
-            pigeon.happiness = max(0, pigeon.happiness - 10)
-            pigeon.velocity[0] = random.randint(-5, 5)
-            pigeon.velocity[1] = random.randint(-5, 5)
-        elif event_name == 'make_friend':
-            pigeon.happiness = min(100, pigeon.happiness + 20)
-        elif event_name == 'take_nap':
-            pigeon.energy = min(100, pigeon.energy + 30)
+    """Random pigeon events scheduled as Poisson processes.
+
+    Each (pigeon, event) pair has its next firing time drawn from an
+    exponential distribution and kept in a min-heap, so checking for events
+    costs nothing until one is due, however often it is called and however
+    many pigeons and event types there are.
+    """
+    def __init__(self, clock, events=EVENTS, rng=random):
+        self.clock = clock  # Returns the current time in ms
+        self.events = events
+        self.rng = rng
+        self.queue = []  # (due time in ms, sequence, event name, pigeon)
+        self.sequence = itertools.count()  # Breaks ties so pigeons are never compared
+        self.pigeons = set()
+
+    def add_pigeon(self, pigeon):
+        """Start scheduling events for a pigeon."""
+        self.pigeons.add(pigeon)
+        now = self.clock()
+        for name in self.events:
+            self.schedule(name, pigeon, now)
+
+    def reset(self, pigeons):
+        """Drop every queued event and schedule the given pigeons afresh from now.
+
+        Used when the clock jumps or the flock is replaced wholesale, so an
+        absence never fires a backlog of events at once.
+        """
+        self.queue = []
+        self.pigeons = set()
+        for pigeon in pigeons:
+            self.add_pigeon(pigeon)
+
+    def remove_pigeon(self, pigeon):
+        """Stop events for a pigeon; its queued entries are dropped as they come due."""
+        self.pigeons.discard(pigeon)
+
+    def schedule(self, name, pigeon, after):
+        """Queue the next firing of an event for a pigeon, some time after the given ms.
+
+        An event with a rate of 0 is never queued.
+        """
+        rate = self.events[name].rate
+        if rate <= 0:
+            return
+        delay = self.rng.expovariate(rate) * 1000
+        heapq.heappush(self.queue, (after + delay, next(self.sequence), name, pigeon))
+
+    def check_events(self):
+        """Fire every event that has come due and return (pigeon, message) pairs."""
+        queue = self.queue
+        now = self.clock()
+        triggered = []
+        while queue and queue[0][0] <= now:
+            due, _, name, pigeon = heapq.heappop(queue)
+            if pigeon not in self.pigeons:
+                continue
+            event = self.events[name]
+            event.handler(pigeon, self.rng)
+            triggered.append((pigeon, event.message))
+            # Count from when it was due, so the rate holds however coarsely this is polled
+            self.schedule(name, pigeon, due)
+        return triggered
@@ -0,0 +1,206 @@
+import random
+import numpy as np
+import pygame
+from mess import MessStore, DENSE_CELL
+from particles import ParticleSystem
+from utils import BASE_RATE
+
+# Pigeons turn around when BODY_HALF_WIDTH either side of their centre reaches these lines
+BODY_HALF_WIDTH = 50
+WALK_LEFT, WALK_TOP, WALK_RIGHT, WALK_BOTTOM = 20, 20, 780, 500
+VECTOR_MIN = 16  # Below this many pigeons, stepping each row in Python beats NumPy's per-call overhead
+
+
+class Flock:
+    """Column storage for every pigeon in a room.
+
+    Each pigeon is one row: positions, velocities, stats and behaviour timers
+    live in NumPy arrays, and strings and object references in parallel
+    lists. Movement, stat decay, animation phases and wall bouncing run as one
+    vectorized pass over all rows; the rare per-pigeon decisions (choosing an
+    action, finishing a meal, chasing the ball) still go through the row's
+    classes.Pigeon view. The flock's pigeons share one floor, so dander and
+    droppings are stored here rather than per bird.
+    """
+    # Stat drift per step at BASE_RATE while not eating
+    hunger_rate = 0.02
+    energy_decay = 0.01
+    cleanliness_decay = 0.015
+    happiness_decay = 0.01
+    action_interval = 3000  # ms between choose_action calls
+    eating_duration = 800   # 0.8 seconds per seed
+    pet_duration = 1000     # 1 second of happy animation
+    play_duration = 5000    # 5 seconds of playing
+
+    COLUMNS = (
+        ('x', np.float64), ('y', np.float64), ('prev_x', np.float64), ('prev_y', np.float64),
+        ('dx', np.float64), ('dy', np.float64),
+        ('health', np.float64), ('happiness', np.float64), ('hunger', np.float64),
+        ('cleanliness', np.float64), ('energy', np.float64),
+        ('last_action_time', np.float64), ('leg_phase', np.float64),
+        ('is_eating', np.bool_), ('eating_time', np.float64), ('eating_animation_phase', np.float64),
+        ('being_petted', np.bool_), ('pet_time', np.float64), ('pet_animation_phase', np.float64),
+        ('playing_with_ball', np.bool_), ('play_start_time', np.float64),
+        ('target_slot', np.int64),  # Particle slot of the seed the pigeon has claimed, or -1
+    )
+    OBJECTS = ('action', 'action_message', 'target_seed', 'target_ball')
+
+    def __init__(self, clock=None, particles=None, capacity=16, fold_at=DENSE_CELL, rng=None):
+        self.clock = clock or pygame.time.get_ticks  # Returns the current time in ms
+        # Every random choice the pigeons make comes from here
+        self.rng = rng if rng is not None else random.Random()
+        # Feeding crumbs go here; whoever owns the particle system steps it
+        self.particles = particles if particles is not None else ParticleSystem(rng=self.rng)
+        # Cells holding more than fold_at points fold into per-cell counts, so a
+        # neglected room stays cheap; None keeps every point
+        self.dander = MessStore(fold_at=fold_at)
+        self.droppings = MessStore(fold_at=fold_at)
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        for name in self.OBJECTS:
+            setattr(self, name, [])
+        self.pigeons = []  # Row views, indexed by row
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def reserve(self, extra):
+        """Make room for extra more rows, growing geometrically."""
+        needed = self.count + extra
+        if needed > len(self.x):
+            capacity = max(needed, len(self.x) * 2)
+            for name, dtype in self.COLUMNS:
+                column = np.zeros(capacity, dtype=dtype)
+                column[:self.count] = getattr(self, name)[:self.count]
+                setattr(self, name, column)
+
+    def add(self, pigeon, x, y):
+        """Append a row for the view pigeon, starting at (x, y), and return its index."""
+        self.reserve(1)
+        row = self.count
+        for name, _ in self.COLUMNS:
+            getattr(self, name)[row] = 0
+        self.x[row] = self.prev_x[row] = x
+        self.y[row] = self.prev_y[row] = y
+        self.dx[row] = 2
+        self.health[row] = self.happiness[row] = 100
+        self.cleanliness[row] = self.energy[row] = 100
+        self.last_action_time[row] = self.clock()
+        self.target_slot[row] = -1
+        self.action.append("idle")
+        self.action_message.append("")  # The view sets its opening line
+        self.target_seed.append(None)
+        self.target_ball.append(None)
+        self.pigeons.append(pigeon)
+        self.count += 1
+        return row
+
+    def remove(self, row):
+        """Drop a row by moving the last row into its place."""
+        last = self.count - 1
+        if row != last:
+            for name, _ in self.COLUMNS:
+                column = getattr(self, name)
+                column[row] = column[last]
+            for name in self.OBJECTS + ('pigeons',):
+                values = getattr(self, name)
+                values[row] = values[last]
+            self.pigeons[row].row = row
+        for name in self.OBJECTS + ('pigeons',):
+            getattr(self, name).pop()
+        self.count = last
+
+    def copy(self, particles=None):
+        """Return an independent flock with the same rows, for render snapshots."""
+        clone = Flock(self.clock, particles if particles is not None else self.particles, max(1, self.count),
+                      rng=self.rng)
+        for name, _ in self.COLUMNS:
+            getattr(clone, name)[:self.count] = getattr(self, name)[:self.count]
+        for name in self.OBJECTS:
+            setattr(clone, name, list(getattr(self, name)))
+        clone.dander = self.dander.copy()
+        clone.droppings = self.droppings.copy()
+        clone.pigeons = [pigeon.rebind(clone) for pigeon in self.pigeons]
+        clone.count = self.count
+        return clone
+
+    def claimed_seeds(self):
+        """Particle slots of the seeds some pigeon has claimed."""
+        slots = self.target_slot[:self.count]
+        return set(slots[slots >= 0].tolist())
+
+    def rows_within(self, pos, radius):
+        """Rows of the pigeons no further than radius from pos."""
+        n = self.count
+        dx = self.x[:n] - pos[0]
+        dy = self.y[:n] - pos[1]
+        return np.flatnonzero(dx * dx + dy * dy <= radius * radius)
+
+    def update(self, dt=1 / BASE_RATE):
+        """Advance every pigeon by dt seconds.
+
+        Matches calling Pigeon.update on each row; small flocks do exactly
+        that, large ones run each system over all rows at once.
+        """
+        n = self.count
+        if n < VECTOR_MIN:
+            for pigeon in self.pigeons:
+                pigeon.update(dt)
+            return
+        now = self.clock()
+        steps = dt * BASE_RATE
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+
+        # Petting animation
+        petted = self.being_petted[:n]
+        self.pet_animation_phase[:n][petted] += 0.2 * steps
+        done = petted & (now - self.pet_time[:n] >= self.pet_duration)
+        petted[done] = False
+        self.pet_animation_phase[:n][done] = 0
+
+        # Stats drift only while not eating
+        eating = self.is_eating[:n].copy()
+        idle = ~eating
+        for name, rate, limit in (
+            ('hunger', self.hunger_rate, 100),
+            ('energy', -self.energy_decay, 0),
+            ('cleanliness', -self.cleanliness_decay, 0),
+            ('happiness', -self.happiness_decay, 0),
+        ):
+            column = getattr(self, name)[:n]
+            clamp = np.minimum if rate > 0 else np.maximum
+            column[idle] = clamp(limit, column[idle] + rate * steps)
+
+        # Eating pigeons animate and stay put this step
+        self.eating_animation_phase[:n][eating] += 0.2 * steps
+        for row in np.flatnonzero(eating & (now - self.eating_time[:n] >= self.eating_duration)).tolist():
+            self.pigeons[row].finish_eating()
+
+        for row in np.flatnonzero(idle & self.playing_with_ball[:n]).tolist():
+            self.pigeons[row].update_play(now, steps)
+
+        self.leg_phase[:n][idle & ((self.dx[:n] != 0) | (self.dy[:n] != 0))] += 0.2 * steps
+
+        due = idle & (now - self.last_action_time[:n] > self.action_interval)
+        for row in np.flatnonzero(due).tolist():
+            self.pigeons[row].choose_action()
+        self.last_action_time[:n][due] = now
+
+        self.move(idle & ((self.dx[:n] != 0) | (self.dy[:n] != 0)), steps)
+
+    def move(self, rows, steps=1):
+        """Move the rows selected by a boolean mask and bounce them off the walls.
+
+        Pigeon.update applies the same rule to one row at a time for small flocks.
+        """
+        n = self.count
+        x, y, dx, dy = self.x[:n], self.y[:n], self.dx[:n], self.dy[:n]
+        x[rows] += dx[rows] * steps
+        y[rows] += dy[rows] * steps
+        bounce = rows & ((x - BODY_HALF_WIDTH <= WALK_LEFT) | (x + BODY_HALF_WIDTH >= WALK_RIGHT))
+        dx[bounce] = -dx[bounce]
+        bounce = rows & ((y - BODY_HALF_WIDTH <= WALK_TOP) | (y + BODY_HALF_WIDTH >= WALK_BOTTOM))
+        dy[bounce] = -dy[bounce]
@@ -0,0 +1,195 @@
+import numpy as np
+import pygame
+from particles import SEED_COLOR
+from sprites import sprite_cache
+from utils import (
+    draw_room, FLOOR_COLOR, DANDER_COLOR, DROPPING_COLOR,
+    WINDOW_WIDTH, ROOM_TOP, ROOM_BOTTOM, WALL_THICKNESS
+)
+
+DANDER_RADIUS = 3
+DROPPING_RADIUS = 5
+PATCH_SPOTS = 24  # Circles painted on the texture standing in for a folded mess cell
+SEED_MARGIN = 8   # Reaches past the half width of the largest seed sprite
+
+
+def dirty_patch(cell_size, color, radius, seed=0):
+    """Texture for a cell of folded mess: a fixed scatter of mess circles."""
+    patch = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+    rng = np.random.default_rng(seed)
+    for x, y in rng.integers(0, cell_size, size=(PATCH_SPOTS, 2)).tolist():
+        pygame.draw.circle(patch, color, (x, y), radius)
+    return patch.convert_alpha()
+
+
+class FloorLayer:
+    """Cached surface holding the floor, walls, all mess and resting seeds.
+
+    New mess is stamped onto the surface as it appears; cleaned mess only
+    re-renders the tiles it touched. Seeds that have landed are baked in the
+    same way until a pigeon starts eating them. Drawing the floor is then a
+    single blit no matter how much mess has piled up.
+    """
+    def __init__(self, tile_size=64):
+        self.rect = pygame.Rect(0, ROOM_TOP, WINDOW_WIDTH, ROOM_BOTTOM - ROOM_TOP)
+        self.surface = pygame.Surface(self.rect.size).convert()
+        self.tile_size = tile_size
+        self.synced = {}  # layer name -> (store uid, revision)
+        self.dirty_tiles = set()
+        self.changed = []  # Screen rects repainted since take_changes()
+        self.patches = {}  # layer name -> folded cell texture
+        empty = np.empty(0)
+        # Baked seeds as (slots, xs, ys, rotations, scales), sorted by slot
+        self.seeds = (np.empty(0, dtype=np.int64), empty, empty, empty, empty)
+
+    def layers(self, pigeon):
+        """Mess stores in the order they are painted, with their look."""
+        return (
+            ('dander', pigeon.dander, DANDER_COLOR, DANDER_RADIUS),
+            ('droppings', pigeon.droppings, DROPPING_COLOR, DROPPING_RADIUS),
+        )
+
+    def sync(self, pigeon):
+        """Bring the cached surface up to date with the pigeon's mess and resting seeds."""
+        layers = self.layers(pigeon)
+        # Baked seeds lie on top of all mess, so new mess under them redraws its tiles
+        top_layer = layers[-1][0] if not len(self.seeds[0]) else None
+        for name, store, color, radius in layers:
+            uid, revision = self.synced.get(name, (None, None))
+            changes = store.changes_since(revision) if uid == store.uid else None
+            if changes is None or any(kind == 'clear' for _, kind, _, _ in changes):
+                self.rebuild(layers)
+                break
+            for _, kind, xs, ys in changes:
+                if kind == 'add' and name == top_layer:
+                    self.stamp(xs, ys, color, radius)
+                    self.changed.append(self.points_rect(xs, ys, radius))
+                else:
+                    # Removals, and additions that must stay under later layers
+                    self.invalidate(xs, ys, radius)
+            self.synced[name] = (store.uid, store.revision)
+        self.sync_seeds(pigeon.particles)
+
+        if self.dirty_tiles:
+            for tile in self.dirty_tiles:
+                self.redraw_tile(tile, layers)
+            self.dirty_tiles.clear()
+
+    def rebuild(self, layers):
+        """Repaint the whole layer from the mess stores."""
+        self.paint_background(None)
+        self.changed.append(self.rect.copy())
+        for name, store, color, radius in layers:
+            self.stamp_folded(name, store, color, radius, np.flatnonzero(store.folded))
+            self.stamp(store.x[:store.count], store.y[:store.count], color, radius)
+            self.synced[name] = (store.uid, store.revision)
+        self.stamp_seeds(*self.seeds[1:])
+        self.dirty_tiles.clear()
+
+    def sync_seeds(self, particles):
+        """Bake newly resting seeds into the surface and repaint where baked seeds left."""
+        slots = particles.resting_seeds()
+        xs, ys = particles.x[slots], particles.y[slots]
+        old_slots, old_xs, old_ys = self.seeds[:3]
+        # A seed stays baked while its slot rests at the same spot
+        kept = np.zeros(len(slots), dtype=bool)
+        gone = np.ones(len(old_slots), dtype=bool)
+        if len(old_slots) and len(slots):
+            index = np.searchsorted(old_slots, slots).clip(0, len(old_slots) - 1)
+            kept = (old_slots[index] == slots) & (old_xs[index] == xs) & (old_ys[index] == ys)
+            gone[index[kept]] = False
+        rotations, scales = particles.rotation[slots], particles.scale[slots]
+        self.seeds = (slots, xs, ys, rotations, scales)
+        self.invalidate(old_xs[gone], old_ys[gone], SEED_MARGIN)
+        new = ~kept
+        if new.any():
+            self.stamp_seeds(xs[new], ys[new], rotations[new], scales[new])
+            self.changed.append(self.points_rect(xs[new], ys[new], SEED_MARGIN))
+
+    def paint_background(self, clip):
+        """Paint floor and walls, limited to clip (in layer coordinates) if given."""
+        self.surface.set_clip(clip)
+        self.surface.fill(FLOOR_COLOR)
+        draw_room(self.surface, self.rect.width, self.rect.height, WALL_THICKNESS, 0)
+        self.surface.set_clip(None)
+
+    def stamp(self, xs, ys, color, radius):
+        """Draw mess circles at world positions."""
+        circle = pygame.draw.circle
+        surface = self.surface
+        top = self.rect.top
+        for x, y in zip(xs.astype(int).tolist(), ys.astype(int).tolist()):
+            circle(surface, color, (x, y - top), radius)
+
+    def stamp_seeds(self, xs, ys, rotations, scales):
+        """Blit seed sprites at world positions."""
+        self.surface.blits(sprite_cache.seed_batch(xs, ys - self.rect.top, 3 * scales, rotations, SEED_COLOR, 255),
+                           doreturn=False)
+
+    def stamp_folded(self, name, store, color, radius, cells):
+        """Draw the dirty patch texture over folded mess cells."""
+        if not len(cells):
+            return
+        grid = store.grid
+        patch = self.patches.get(name)
+        if patch is None:
+            patch = self.patches[name] = dirty_patch(grid.cell_size, color, radius, seed=len(self.patches))
+        size = grid.cell_size
+        top = grid.top - self.rect.top
+        self.surface.blits([(patch, (grid.left + col * size, top + row * size))
+                            for row, col in zip(*(part.tolist() for part in np.divmod(cells, grid.cols)))],
+                           doreturn=False)
+
+    def invalidate(self, xs, ys, radius):
+        """Mark the tiles covered by circles at these world positions for redrawing."""
+        if not len(xs):
+            return
+        size = self.tile_size
+        top = self.rect.top
+        cols = np.arange((int(xs.min()) - radius) // size, (int(xs.max()) + radius) // size + 1)
+        rows = np.arange((int(ys.min()) - top - radius) // size, (int(ys.max()) - top + radius) // size + 1)
+        if len(cols) * len(rows) <= 4 * len(xs):
+            self.dirty_tiles.update((c, r) for c in cols.tolist() for r in rows.tolist())
+            return
+        # Scattered removals: only the tiles around each point
+        for dx in (-radius, radius):
+            for dy in (-radius, radius):
+                tile_cols = (xs.astype(int) + dx) // size
+                tile_rows = (ys.astype(int) - top + dy) // size
+                self.dirty_tiles.update(zip(tile_cols.tolist(), tile_rows.tolist()))
+
+    def redraw_tile(self, tile, layers):
+        """Re-render one tile from the mess stores."""
+        size = self.tile_size
+        clip = pygame.Rect(tile[0] * size, tile[1] * size, size, size).clip(self.surface.get_rect())
+        if not clip.width or not clip.height:
+            return
+        self.paint_background(clip)
+        self.changed.append(clip.move(self.rect.topleft))
+        self.surface.set_clip(clip)
+        top = self.rect.top
+        for name, store, color, radius in layers:
+            left, right = clip.left - radius, clip.right + radius
+            upper, lower = clip.top + top - radius, clip.bottom + top + radius
+            self.stamp_folded(name, store, color, radius,
+                              store.folded_cells(clip.left, clip.top + top, clip.right - 1, clip.bottom + top - 1))
+            for start, stop in store.spans(left, upper, right, lower):
+                xs = store.x[start:stop]
+                ys = store.y[start:stop]
+                near = (xs >= left) & (xs <= right) & (ys >= upper) & (ys <= lower)
+                self.stamp(xs[near], ys[near], color, radius)
+        _, xs, ys, rotations, scales = self.seeds
+        near = ((xs >= clip.left - SEED_MARGIN) & (xs <= clip.right + SEED_MARGIN)
+                & (ys >= clip.top + top - SEED_MARGIN) & (ys <= clip.bottom + top + SEED_MARGIN))
+        self.stamp_seeds(xs[near], ys[near], rotations[near], scales[near])
+        self.surface.set_clip(None)
+
+    def points_rect(self, xs, ys, radius):
+        """Screen rect covering circles of radius at these world positions."""
+        left, top = int(xs.min()) - radius, int(ys.min()) - radius
+        return pygame.Rect(left, top, int(xs.max()) + radius - left + 1, int(ys.max()) + radius - top + 1)
+
+    def take_changes(self):
+        """Return the screen rects repainted since the last call, for dirty-rect drawing."""
+        changed, self.changed = self.changed, []
+        return changed
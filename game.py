@@ -1,58 +1,113 @@
-import pygame
+import os
 import random
-from classes import Pigeon, Sparkle, SeedParticle, Ball
+import threading
+import time
+from collections import deque
+import pygame
+from classes import prewarm_poses, PIGEON_MESSAGES
+from floor import FloorLayer
+from particles import SPARKLE
+from render import DirtyRenderer
+from scheduler import FixedStepScheduler, TickRateMeter
+from text import get_font, render_text
+from snapshot import SnapshotBuffer, take_snapshot
+from simulation import (
+    Simulation, InputState,
+    WINDOW_WIDTH, WINDOW_HEIGHT, ROOM_TOP
+)
 from utils import (
-    draw_status_bars, draw_room, draw_cloth,
-    draw_vacuum, draw_feed_cursor,
-    FLOOR_COLOR, WALL_COLOR, BLACK, GRAY, DANDER_COLOR, DROPPING_COLOR
+    draw_status_bars, status_fill_widths, draw_cloth,
+    draw_vacuum, draw_feed_cursor, status_values,
+    BLACK, GRAY, STATUS_AREA
 )
 
-# Game Constants
-WINDOW_WIDTH = 800
-WINDOW_HEIGHT = 700  # Increased to accommodate UI
-ROOM_TOP = 80       # Room starts below status bars
-ROOM_BOTTOM = 600   # Room ends above buttons
-WALL_THICKNESS = 20
-
-class Game:
-    def __init__(self):
-        pygame.init()
+# Simulation speed multipliers selectable with the number keys; None runs as fast as possible
+TIME_SCALE_KEYS = {
+    pygame.K_1: 1,
+    pygame.K_2: 2,
+    pygame.K_3: 10,
+    pygame.K_4: 100,
+    pygame.K_5: None,
+}
+FLAT_OUT_BATCH = 32  # Steps run between clock checks when going as fast as possible
+DIRTY_OVERLAY_KEY = pygame.K_F3  # Toggles outlines of the regions redrawn each frame
+METRICS_OVERLAY_KEY = pygame.K_F2  # Toggles the frame timing overlay
+
+
+def init_pygame():
+    """Start only the pygame modules the game uses.
+
+    pygame.init() would also open audio and joysticks, which the game never
+    touches and which can take a noticeable part of startup on some machines.
+    """
+    pygame.display.init()
+    pygame.font.init()
+
+
+class Game(Simulation):
+    def __init__(self, sim_rate=60, render_rate=60, threaded=False, show_dirty=False, flock_size=1,
+                 seed=None, record=None):
+        init_pygame()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Pigeon Simulator")
-        self.clock = pygame.time.Clock()
-
-        # Game objects
-        self.pigeon = Pigeon(WINDOW_WIDTH // 2, (ROOM_TOP + ROOM_BOTTOM) // 2)
-        self.messages = []
-        self.sparkles = []
-        self.seeds = []
-        self.ball = None
-
-        # UI elements
+        self.floor_layer = FloorLayer()
+        self.frame_clock = pygame.time.Clock()
+        self.scheduler = FixedStepScheduler(sim_rate)
+        self.render_rate = render_rate
+        self.threaded = threaded
+        self.time_scale = 1
+        self.tick_meter = TickRateMeter()
+        # A recording needs a known seed to replay from
+        if record and seed is None:
+            seed = random.randrange(2 ** 63)
+        Simulation.__init__(self, flock_size=flock_size, seed=seed)
+        self.recorder = None
+        if record:
+            from replay import InputRecorder
+            self.recorder = InputRecorder(record, seed, self.scheduler.dt, flock_size)
+        self.metrics = None  # FrameMetrics while instrumented
+        self.autosaver = None
         self.setup_ui()
-
-        # Game modes
-        self.cloth_mode = False
-        self.vacuum_mode = False
-        self.feed_mode = False
+        self.renderer.show_dirty = show_dirty
+        self.prewarm()
 
         self.running = True
-        self.last_clean_time = 0
-        self.cleaning_score = 0
-        self.combo_multiplier = 1.0
+        self.pending_clicks = deque()
+        self.pending_time_scales = deque()  # Speed changes from the keyboard, applied by whoever steps the simulation
+        self.mouse_pos = (0, 0)
+        self.mouse_down = False
 
     def setup_ui(self):
         """Initialize UI elements."""
-        self.font = pygame.font.SysFont(None, 24)
-        button_y = ROOM_BOTTOM + 20  # Place buttons below room
-        button_width = 100
-        button_spacing = 30
-        start_x = (WINDOW_WIDTH - (4 * button_width + 3 * button_spacing)) // 2
-
-        self.vacuum_button = pygame.Rect(start_x, button_y, button_width, 50)
-        self.cloth_button = pygame.Rect(start_x + button_width + button_spacing, button_y, button_width, 50)
-        self.feed_button = pygame.Rect(start_x + 2 * (button_width + button_spacing), button_y, button_width, 50)
-        self.play_button = pygame.Rect(start_x + 3 * (button_width + button_spacing), button_y, button_width, 50)
+        self.font = get_font(24)
+        self.renderer = DirtyRenderer(self.screen, self.compose_background(), self.floor_layer)
+        self.status_key = None
+
+    def prewarm(self):
+        """Render the text and sprites early frames would otherwise build on first use."""
+        for name in status_values(self.pigeon):
+            render_text(name.capitalize(), 24, BLACK)
+        for message in PIGEON_MESSAGES:
+            render_text(message, 24, (0, 0, 0))
+        self.particles.prewarm()
+        prewarm_poses()
+        self.floor_layer.sync(self.pigeon)
+
+    def compose_background(self):
+        """Paint the parts of the window that never change: the fill and the button chrome."""
+        background = pygame.Surface(self.screen.get_size()).convert()
+        background.fill((200, 200, 200))  # Light gray background
+        for button, label in [
+            (self.vacuum_button, "Vacuum"),
+            (self.cloth_button, "Cloth"),
+            (self.feed_button, "Feed"),
+            (self.play_button, "Play")
+        ]:
+            pygame.draw.rect(background, GRAY, button)
+            text = render_text(label, 24, BLACK)
+            text_rect = text.get_rect(center=button.center)
+            background.blit(text, text_rect)
+        return background
 
     def handle_input(self):
         """Process user input events."""
@@ -60,205 +115,257 @@ class Game:
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                self.handle_click(pygame.mouse.get_pos())
-
-    def handle_click(self, pos):
-        """Handle mouse click events."""
-        if self.play_button.collidepoint(pos):
-            if not self.ball or not self.pigeon.playing_with_ball:
-                self.ball = Ball(WINDOW_WIDTH // 2, (ROOM_TOP + ROOM_BOTTOM) // 2)
-                self.pigeon.start_playing(self.ball)
-        elif self.feed_button.collidepoint(pos):
-            self.feed_mode = True
-            self.cloth_mode = False
-            self.vacuum_mode = False
-        elif self.cloth_button.collidepoint(pos):
-            self.cloth_mode = not self.cloth_mode
-            self.feed_mode = False
-            self.vacuum_mode = False
-        elif self.vacuum_button.collidepoint(pos):
-            self.vacuum_mode = not self.vacuum_mode
-            self.cloth_mode = False
-            self.feed_mode = False
-        elif self.feed_mode:
-            self.handle_feed(pos)
-        elif not any([self.cloth_mode, self.vacuum_mode, self.feed_mode]):
-            self.handle_pet(pos)
-
-    def handle_feed(self, pos):
-        """Handle feed mode interaction."""
-        num_seeds = random.randint(8, 12)
-        scatter_radius = 20
-        for _ in range(num_seeds):
-            seed_x = pos[0] + random.uniform(-scatter_radius, scatter_radius)
-            seed_y = pos[1] - random.uniform(20, 40)
-            target_y = pos[1] + random.uniform(-5, 5)
-            self.seeds.append(SeedParticle(seed_x, seed_y, target_y))
-        self.feed_mode = False
-
-    def handle_pet(self, pos):
-        """Handle petting interaction."""
-        dx = pos[0] - self.pigeon.x
-        dy = pos[1] - self.pigeon.y
-        if dx * dx + dy * dy <= 50 * 50:
-            self.pigeon.start_petting()
-
-    def handle_cleaning(self, pos, cleaning_active):
-        """Handle cleaning mode interactions."""
-        if cleaning_active:
-            if self.cloth_mode:
-                self.handle_cloth_cleaning(pos)
-            elif self.vacuum_mode:
-                self.handle_vacuum_cleaning(pos)
-
-    def handle_cloth_cleaning(self, pos):
-        """Handle cloth cleaning interaction."""
-        cloth_rect = pygame.Rect(pos[0] - 20, pos[1] - 20, 40, 40)
-        original_count = len(self.pigeon.droppings)
-        self.pigeon.droppings = [drop for drop in self.pigeon.droppings if not cloth_rect.collidepoint(drop)]
-        cleaned_count = original_count - len(self.pigeon.droppings)
-        if cleaned_count > 0:
-            self.update_cleaning_score(cleaned_count * 10)
-            self.sparkles.append(Sparkle(pos[0], pos[1]))
-
-    def handle_vacuum_cleaning(self, pos):
-        """Handle vacuum cleaning interaction."""
-        vacuum_radius = 25
-        original_count = len(self.pigeon.dander)
-        self.pigeon.dander = [d for d in self.pigeon.dander if (d[0] - pos[0])**2 + (d[1] - pos[1])**2 > vacuum_radius**2]
-        cleaned_count = original_count - len(self.pigeon.dander)
-        if cleaned_count > 0:
-            self.update_cleaning_score(cleaned_count * 5)
-            self.sparkles.append(Sparkle(pos[0], pos[1]))
-
-    def update_cleaning_score(self, points):
-        """Update cleaning score and combo."""
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_clean_time <= 2000:
-            self.combo_multiplier = min(self.combo_multiplier + 0.5, 4.0)
+                self.pending_clicks.append(event.pos)
+            elif event.type == pygame.KEYDOWN and event.key in TIME_SCALE_KEYS:
+                self.pending_time_scales.append(TIME_SCALE_KEYS[event.key])
+            elif event.type == pygame.KEYDOWN and event.key == DIRTY_OVERLAY_KEY:
+                self.renderer.show_dirty = not self.renderer.show_dirty
+            elif event.type == pygame.KEYDOWN and event.key == METRICS_OVERLAY_KEY:
+                self.toggle_metrics_overlay()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.renderer.invalidate()
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.mouse_down = pygame.mouse.get_pressed()[0]
+
+    def read_input(self):
+        """Collect the current mouse state and queued clicks for the next step."""
+        clicks = []
+        while self.pending_clicks:
+            clicks.append(self.pending_clicks.popleft())
+        return InputState(self.mouse_pos, self.mouse_down, clicks)
+
+    def enable_metrics(self, overlay=False, dump_path=None, port=None):
+        """Instrument the frame phases, optionally showing the overlay and exporting the results."""
+        if not self.metrics:
+            from metrics import FrameMetrics
+            self.metrics = FrameMetrics(dump_path=dump_path)
+            self.metrics.instrument(self)
+        self.metrics.show_overlay = overlay
+        if dump_path:
+            self.metrics.dump_path = dump_path
+        if port and not self.metrics.server:
+            self.metrics.serve(port)
+
+    def toggle_metrics_overlay(self):
+        """Show or hide the timing overlay; timing stops when nothing else needs it."""
+        metrics = self.metrics
+        if not metrics:
+            self.enable_metrics(overlay=True)
+        elif not metrics.show_overlay:
+            metrics.show_overlay = True
+        elif metrics.dump_path or metrics.server:
+            metrics.show_overlay = False
         else:
-            self.combo_multiplier = 1.0
-        self.last_clean_time = current_time
-        self.cleaning_score += int(points * self.combo_multiplier)
+            metrics.uninstrument()
+            self.metrics = None
+
+    def enable_autosave(self, path, interval):
+        """Resume from the save at path if there is one, then keep saving to it.
+
+        After a long absence the time away is caught up in one go, which
+        settles seeds, effects and the ball; a quick restart resumes the room
+        exactly as it was saved.
+        """
+        from savegame import Autosaver, load, CATCH_UP_AFTER
+        if self.recorder:
+            raise ValueError("a recorded session must start from its seed, not from a save")
+        if os.path.exists(path):
+            saved_at = load(self, path)
+            now = time.time()
+            if saved_at is not None and now - saved_at >= CATCH_UP_AFTER:
+                self.catch_up(now - saved_at)
+            self.renderer.invalidate()
+        self.autosaver = Autosaver(path, interval)
+
+    def set_time_scale(self, scale):
+        """Run the simulation scale times faster than real time, or flat out if scale is None.
+
+        This changes the scheduler, so once the simulation thread is running
+        it must only be called from there; other threads queue the change on
+        pending_time_scales instead.
+        """
+        self.time_scale = scale
+        self.scheduler.time_scale = scale or 1
+        self.scheduler.accumulator = 0.0
+
+    @property
+    def ticks_per_second(self):
+        """Simulation steps achieved over the last second."""
+        return self.tick_meter.rate
 
     def update(self):
-        """Update game state."""
-        mouse_pos = pygame.mouse.get_pos()
-        cleaning_active = pygame.mouse.get_pressed()[0]
-
-        self.handle_cleaning(mouse_pos, cleaning_active)
-        self.pigeon.update()
-        self.sparkles = [spark for spark in self.sparkles if spark.update()]
-
-        # Update seeds and check for eating
-        for seed in self.seeds[:]:
-            if not seed.update():  # If seed has completely faded out
-                self.seeds.remove(seed)
-                continue
-
-            if not seed.falling and not seed.being_eaten:
-                dx = seed.x - self.pigeon.x
-                dy = seed.y - self.pigeon.y
-                distance = dx * dx + dy * dy
-
-                # If pigeon is close enough to eat
-                if distance < 50 * 50:
-                    if not self.pigeon.is_eating:
-                        self.pigeon.eat_seed((seed.x, seed.y), seed)
-                # If seed is visible and not too far, move towards it
-                elif distance < 200 * 200 and not self.pigeon.is_eating:
-                    self.pigeon.move_towards_seed((seed.x, seed.y))
-
-        # Update ball if it exists
-        if self.ball:
-            self.ball.update(WINDOW_WIDTH, WINDOW_HEIGHT, WALL_THICKNESS)
-
-            # Check if ball should be removed
-            edge_margin = 50
-            near_edge = (
-                self.ball.x <= WALL_THICKNESS + edge_margin or
-                self.ball.x >= WINDOW_WIDTH - WALL_THICKNESS - edge_margin or
-                self.ball.y <= ROOM_TOP + edge_margin or #Corrected y-coordinate check
-                self.ball.y >= ROOM_BOTTOM - WALL_THICKNESS - edge_margin
-            )
-
-            # Only remove if ball has been pushed and is near edge
-            if not self.ball.being_pushed and near_edge and self.pigeon.playing_with_ball:
-                self.ball = None
-                self.pigeon.playing_with_ball = False
-                self.pigeon.action_message = "That was fun!"
-
-    def draw(self):
-        """Render game state."""
-        # Fill background
-        self.screen.fill((200, 200, 200))  # Light gray background
-
-        # Draw room background
-        pygame.draw.rect(self.screen, FLOOR_COLOR, 
-                        (0, ROOM_TOP, WINDOW_WIDTH, ROOM_BOTTOM - ROOM_TOP))
-
-        # Draw room walls
-        draw_room(self.screen, WINDOW_WIDTH, ROOM_BOTTOM - ROOM_TOP, WALL_THICKNESS, ROOM_TOP)
+        """Advance game state by one fixed simulation step."""
+        input_state = self.read_input()
+        if self.recorder:
+            self.recorder.record(input_state)
+        self.step(self.scheduler.dt, input_state)
+
+    def run_steps(self, elapsed):
+        """Run the simulation steps due after elapsed seconds of real time and return how many ran."""
+        while self.pending_time_scales:
+            self.set_time_scale(self.pending_time_scales.popleft())
+        if self.time_scale is None:
+            steps = self.run_flat_out(1 / self.render_rate)
+        else:
+            steps = self.scheduler.advance(elapsed)
+            for _ in range(steps):
+                self.update()
+        self.tick_meter.add(steps)
+        if steps and self.autosaver:
+            self.autosaver.maybe_save(self)
+        return steps
+
+    def run_flat_out(self, budget):
+        """Step the simulation as fast as possible for budget seconds."""
+        deadline = time.perf_counter() + budget
+        steps = 0
+        while self.running:
+            for _ in range(FLAT_OUT_BATCH):
+                self.update()
+            steps += FLAT_OUT_BATCH
+            if time.perf_counter() >= deadline:
+                break
+        return steps
+
+    def draw(self, alpha=1.0, state=None):
+        """Render game state, interpolating moving objects alpha of the way into the last step.
+
+        state is a RenderSnapshot to draw instead of the live simulation.
+        """
+        state = state or self
+        renderer = self.renderer
+        # Erase last frame's moving elements, then put any newly painted floor on screen
+        self.floor_layer.sync(state.pigeon)
+        renderer.begin()
+        for rect in self.floor_layer.take_changes():
+            renderer.restore(rect)
+            renderer.push(rect)
 
         # Draw status bars (at the top)
-        draw_status_bars(self.screen, self.pigeon)
+        self.draw_status(state)
 
         # Draw game objects
-        self.draw_game_objects()
-        self.draw_ui()
+        self.draw_game_objects(alpha, state)
+        self.draw_ui(state)
+        if self.metrics and self.metrics.show_overlay:
+            renderer.mark(self.metrics.draw_overlay(self.screen))
 
         # Update display
-        pygame.display.flip()
-
-    def draw_game_objects(self):
+        renderer.present()
+
+    def draw_status(self, state):
+        """Redraw the status bars when their values change or something erased them."""
+        key = status_fill_widths(state.pigeon)
+        if key == self.status_key and not self.renderer.touched(STATUS_AREA):
+            return
+        self.status_key = key
+        self.renderer.restore(STATUS_AREA)
+        draw_status_bars(self.screen, state.pigeon)
+        self.renderer.push(STATUS_AREA)
+
+    def draw_game_objects(self, alpha=1.0, state=None):
         """Draw all game objects."""
-        for pos in self.pigeon.dander:
-            pygame.draw.circle(self.screen, DANDER_COLOR, (int(pos[0]), int(pos[1])), 3)
-        for pos in self.pigeon.droppings:
-            pygame.draw.circle(self.screen, DROPPING_COLOR, (int(pos[0]), int(pos[1])), 5)
-        for spark in self.sparkles:
-            spark.draw(self.screen)
-        for seed in self.seeds:
-            seed.draw(self.screen)
-
-        self.pigeon.draw(self.screen)
-        self.pigeon.draw_feeding_effects(self.screen)
-
-        if self.ball:
-            self.ball.draw(self.screen)
-
-    def draw_ui(self):
+        state = state or self
+        mark = self.renderer.mark
+        # Fading particles come from the sprite cache and go out in one batch each
+        self.screen.blits(state.particles.sprites(SPARKLE, alpha), doreturn=False)
+        # Resting seeds are baked into the floor layer
+        state.particles.draw_seeds(self.screen, alpha, resting=False)
+        for rect in state.particles.bounds(resting=False):
+            mark(rect)
+
+        for pigeon in state.flock.pigeons:
+            pigeon.draw(self.screen, alpha)
+            mark(pigeon.bounds(alpha))
+        state.pigeon.draw_feeding_effects(self.screen)
+
+        if state.ball:
+            state.ball.draw(self.screen, alpha)
+            mark(state.ball.bounds(alpha))
+
+    def draw_ui(self, state=None):
         """Draw UI elements."""
-        # Draw buttons
-        for button, label in [
-            (self.vacuum_button, "Vacuum"),
-            (self.cloth_button, "Cloth"),
-            (self.feed_button, "Feed"),
-            (self.play_button, "Play")
-        ]:
-            pygame.draw.rect(self.screen, GRAY, button)
-            text = self.font.render(label, True, BLACK)
-            text_rect = text.get_rect(center=button.center)
-            self.screen.blit(text, text_rect)
-
+        state = state or self
+        # Buttons are part of the static background; only cursors and overlays are drawn here
         # Draw mode-specific cursors
         mouse_pos = pygame.mouse.get_pos()
         cleaning_active = pygame.mouse.get_pressed()[0]
-        pygame.mouse.set_visible(not any([self.cloth_mode, self.vacuum_mode, self.feed_mode]))
+        pygame.mouse.set_visible(not any([state.cloth_mode, state.vacuum_mode, state.feed_mode]))
 
-        if self.cloth_mode:
+        if state.cloth_mode:
             draw_cloth(self.screen, mouse_pos, cleaning_active)
-        elif self.vacuum_mode:
+        elif state.vacuum_mode:
             draw_vacuum(self.screen, mouse_pos, cleaning_active)
-        elif self.feed_mode:
+        elif state.feed_mode:
             draw_feed_cursor(self.screen, mouse_pos)
+        if state.cloth_mode or state.vacuum_mode or state.feed_mode:
+            self.renderer.mark((mouse_pos[0] - 30, mouse_pos[1] - 30, 64, 64))
+
+        if self.time_scale != 1:
+            self.draw_turbo_status()
+
+    def draw_turbo_status(self):
+        """Show the fast-forward speed and the tick rate it actually reaches."""
+        speed = "MAX" if self.time_scale is None else f"x{self.time_scale}"
+        text = render_text(f"{speed}  {self.ticks_per_second:,.0f} ticks/s", 24, BLACK)
+        self.screen.blit(text, (10, ROOM_TOP - 25))
+        self.renderer.mark(text.get_rect(topleft=(10, ROOM_TOP - 25)))
+
+    def stop_recording(self):
+        """Close the input log, if one is being recorded."""
+        if self.recorder:
+            self.recorder.close(self)
+            self.recorder = None
 
     def run(self):
         """Main game loop."""
+        if self.threaded:
+            self.run_threaded()
+            return
+
         while self.running:
-            self.clock.tick(60)
+            elapsed = self.frame_clock.tick(self.render_rate) / 1000
             self.handle_input()
-            self.update()
-            self.draw()
+            self.run_steps(elapsed)
+            self.draw(1.0 if self.time_scale is None else self.scheduler.alpha)
+
+        self.stop_recording()
+        if self.autosaver:
+            self.autosaver.close(self)
+        pygame.quit()
+
+    def run_threaded(self):
+        """Game loop with the simulation on a worker thread and drawing on this one.
 
-        pygame.quit()
\ No newline at end of file
+        Events and the display stay on the main thread, as SDL requires; the
+        simulation publishes a snapshot after each batch of steps and drawing
+        always uses the latest one.
+        """
+        self.snapshots = SnapshotBuffer(take_snapshot(self))
+        sim_thread = threading.Thread(target=self.simulation_loop, name="simulation", daemon=True)
+        sim_thread.start()
+
+        while self.running:
+            self.frame_clock.tick(self.render_rate)
+            self.handle_input()
+            state, _ = self.snapshots.latest()
+            alpha = min(1.0, (time.perf_counter() - state.published_at) / self.scheduler.dt)
+            self.draw(alpha, state)
+
+        sim_thread.join()
+        self.stop_recording()
+        if self.autosaver:
+            self.autosaver.close(self)
+        pygame.quit()
+
+    def simulation_loop(self):
+        """Run fixed simulation steps at the current time scale until the game stops."""
+        last = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            steps = self.run_steps(now - last)
+            last = now
+            if steps:
+                self.snapshots.publish(take_snapshot(self))
+            else:
+                time.sleep(max(0.0, self.scheduler.dt - self.scheduler.accumulator) / self.scheduler.time_scale)
@@ -1,8 +1,86 @@
-from game import Game
+import argparse
+import os
+
 
 def main():
-    game = Game()
+    parser = argparse.ArgumentParser(description="Pigeon Simulator")
+    parser.add_argument("--headless", type=int, metavar="TICKS",
+                        help="run the simulation for TICKS steps without a window and report ticks/second")
+    parser.add_argument("--sim-rate", type=int, default=60,
+                        help="simulation steps per second (default: 60)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="render frames per second (default: 60)")
+    parser.add_argument("--speed", type=float, default=1,
+                        help="simulation speed multiplier; 0 runs as fast as possible (keys 1-5 change it in game)")
+    parser.add_argument("--threaded", action="store_true",
+                        help="run the simulation on its own thread, separate from rendering")
+    parser.add_argument("--pigeons", type=int, default=1,
+                        help="number of pigeons in the room (default: 1)")
+    parser.add_argument("--show-dirty", action="store_true",
+                        help="outline the screen regions redrawn each frame (F3 toggles it in game)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="show per-phase frame timings (F2 toggles them in game)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="write frame timings and entity counts to PATH every second")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve frame timings and entity counts as text on localhost:PORT")
+    parser.add_argument("--profile", metavar="PATH", default=os.environ.get("PIGEON_PROFILE"),
+                        help="sample the game loop and write a flame graph to PATH on exit: speedscope JSON "
+                             "if PATH ends in .json, collapsed stacks otherwise (default: $PIGEON_PROFILE)")
+    parser.add_argument("--profile-interval", type=float, default=5, metavar="MS",
+                        help="milliseconds between profiler samples (default: 5)")
+    parser.add_argument("--save", metavar="PATH",
+                        help="resume from the save at PATH if it exists, and autosave to it while playing and on quit")
+    parser.add_argument("--autosave-interval", type=float, default=30, metavar="SECONDS",
+                        help="seconds between autosaves (default: 30)")
+    parser.add_argument("--seed", type=int,
+                        help="seed the random number generator for a repeatable session")
+    parser.add_argument("--record", metavar="LOG",
+                        help="record every tick's input to LOG for replaying later")
+    parser.add_argument("--replay", metavar="LOG",
+                        help="replay a recorded session headless as fast as possible and report ticks/second")
+    args = parser.parse_args()
+    if args.record and args.save:
+        # A replay rebuilds the room from the seed alone, so it could not start from a loaded save
+        parser.error("--record cannot be combined with --save")
+
+    if args.replay:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from replay import replay
+        sim, rate, matched = replay(args.replay)
+        result = "matches the recording" if matched else "DIFFERS from the recording"
+        print(f"replayed {args.replay}: {rate:,.0f} ticks/s, final state {result}")
+        return
+
+    if args.headless is not None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from simulation import Simulation, run_headless
+        sim = Simulation(flock_size=args.pigeons, seed=args.seed)
+        sim, rate = run_headless(args.headless, dt=1 / args.sim_rate, sim=sim)
+        print(f"{args.headless} ticks in headless mode: {rate:,.0f} ticks/s")
+        return
+
+    from game import Game
+    game = Game(sim_rate=args.sim_rate, render_rate=args.fps, threaded=args.threaded,
+                show_dirty=args.show_dirty, flock_size=args.pigeons,
+                seed=args.seed, record=args.record)
+    game.set_time_scale(args.speed or None)
+    if args.save:
+        game.enable_autosave(args.save, args.autosave_interval)
+    if args.metrics or args.metrics_file or args.metrics_port:
+        game.enable_metrics(overlay=args.metrics, dump_path=args.metrics_file, port=args.metrics_port)
+    if args.profile:
+        from profiler import SamplingProfiler
+        profiler = SamplingProfiler(game, interval=args.profile_interval / 1000)
+        profiler.start()
+        try:
+            game.run()
+        finally:
+            profiler.stop()
+            profiler.write(args.profile)
+            print(f"wrote {sum(profiler.stacks.values())} samples to {args.profile}")
+        return
     game.run()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,318 @@
+import itertools
+from collections import deque
+from collections.abc import Sequence
+import numpy as np
+from spatial import GridGeometry
+
+MESS_GRID = GridGeometry(cell_size=32)
+BULK_INSERT = 64  # Above this many points, whole-array NumPy passes beat moving them one by one
+JOURNAL_LENGTH = 256  # Changes kept for incremental consumers before they must rebuild
+DENSE_CELL = 40  # Points in one grid cell before the cell is folded into a count
+FOLD_SAMPLES = 8  # Samples per cell side when estimating how much of a cell a cleanup covers
+
+_store_ids = itertools.count()
+
+
+class MessStore(Sequence):
+    """Floor mess positions kept as contiguous NumPy x and y arrays plus a length.
+
+    Points are kept ordered by the grid cell they fall in, so radius and rect
+    removals only test the cells they overlap. Behaves as a read-only
+    sequence of (x, y) tuples for existing callers.
+
+    Every change is also logged in a short journal, so caches built from the
+    store (such as the floor decal layer) can catch up incrementally.
+
+    With fold_at set, a cell holding more than fold_at points is folded: its
+    points are dropped and only their number is kept, and later points
+    landing there just add to it. Cleaning a folded cell removes the share
+    of its count lying in the part of the cell the cleanup newly covers, so
+    going over the same spot again removes nothing more. len() counts folded mess too, so
+    totals stay exact while the stored points stay bounded however long the
+    room is left alone; indexing and iteration only see unfolded points.
+    """
+    def __init__(self, points=(), capacity=64, grid=MESS_GRID, fold_at=None):
+        capacity = max(capacity, len(points))
+        self.grid = grid
+        self.fold_at = fold_at
+        self.folded = np.zeros(grid.cols * grid.rows, dtype=np.int64)  # cell -> folded points
+        self.folded_count = 0
+        # Cell -> which of its sample points cleanups have already covered
+        self.swept = np.zeros((grid.cols * grid.rows, FOLD_SAMPLES * FOLD_SAMPLES), dtype=bool)
+        self.x = np.empty(capacity, dtype=np.float64)
+        self.y = np.empty(capacity, dtype=np.float64)
+        self.cell = np.empty(capacity, dtype=np.int32)
+        self.count = 0
+        self.uid = next(_store_ids)  # Shared with copies, so consumers can tell stores apart
+        self.revision = 0
+        self.journal = deque(maxlen=JOURNAL_LENGTH)
+        if len(points):
+            self.extend(points)
+
+    def __len__(self):
+        return self.count + self.folded_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(self.x[:self.count][index].tolist(), self.y[:self.count][index].tolist()))
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("mess index out of range")
+        return (float(self.x[index]), float(self.y[index]))
+
+    def __iter__(self):
+        return zip(self.x[:self.count].tolist(), self.y[:self.count].tolist())
+
+    @property
+    def points(self):
+        """Read-only (n, 2) array of the stored positions."""
+        points = np.column_stack((self.x[:self.count], self.y[:self.count]))
+        points.flags.writeable = False
+        return points
+
+    def reserve(self, extra):
+        """Make room for extra more points, growing geometrically."""
+        needed = self.count + extra
+        if needed > len(self.x):
+            capacity = max(needed, len(self.x) * 2)
+            for name in ('x', 'y', 'cell'):
+                old = getattr(self, name)
+                grown = np.empty(capacity, dtype=old.dtype)
+                grown[:self.count] = old[:self.count]
+                setattr(self, name, grown)
+
+    def append(self, pos):
+        """Add a single (x, y) point."""
+        self.extend((pos,))
+
+    def extend(self, points):
+        """Add many points at once from an (n, 2) array or an iterable of pairs."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        added = len(points)
+        if not added:
+            return
+        cells = self.grid.cell_indices(points[:, 0], points[:, 1])
+        if self.folded_count:
+            dense = self.folded[cells] > 0
+            if dense.any():
+                # Points landing in folded cells only add to the counts, and
+                # spread over the whole cell again, swept part included
+                np.add.at(self.folded, cells[dense], 1)
+                self.swept[cells[dense]] = False
+                self.folded_count += int(np.count_nonzero(dense))
+                self.log('fold', points[:0, 0], points[:0, 1])
+                points, cells = points[~dense], cells[~dense]
+                added = len(points)
+                if not added:
+                    return
+        order = np.argsort(cells, kind='stable')
+        xs, ys, cells = points[order, 0], points[order, 1], cells[order]
+        self.log('add', xs, ys)
+        self.reserve(added)
+        n = self.count
+        if added > BULK_INSERT:
+            self.x[n:n + added] = xs
+            self.y[n:n + added] = ys
+            self.cell[n:n + added] = cells
+            self.count = n + added
+            order = np.argsort(self.cell[:self.count], kind='stable')
+            self.x[:self.count] = self.x[:self.count][order]
+            self.y[:self.count] = self.y[:self.count][order]
+            self.cell[:self.count] = self.cell[:self.count][order]
+            self.fold_dense(cells)
+            return
+        # Merge from the back: new point j lands at slots[j] + j
+        slots = np.searchsorted(self.cell[:n], cells, side='right').tolist()
+        end = n
+        for j in range(added - 1, -1, -1):
+            start = slots[j]
+            for array, value in ((self.x, xs[j]), (self.y, ys[j]), (self.cell, cells[j])):
+                array[start + j + 1:end + j + 1] = array[start:end]
+                array[start + j] = value
+            end = start
+        self.count = n + added
+        self.fold_dense(cells)
+
+    def fold_dense(self, cells):
+        """Fold those of the given cells that now hold more than fold_at points."""
+        if self.fold_at is None:
+            return
+        stored = self.cell[:self.count]
+        cells = np.unique(cells).astype(np.int32)
+        starts = stored.searchsorted(cells, side='left')
+        stops = stored.searchsorted(cells, side='right')
+        dense = stops - starts > self.fold_at
+        if not dense.any():
+            return
+        mask = np.zeros(self.count, dtype=bool)
+        for start, stop in zip(starts[dense].tolist(), stops[dense].tolist()):
+            mask[start:stop] = True
+        self.folded[cells[dense]] += (stops - starts)[dense]
+        self.swept[cells[dense]] = False
+        self.folded_count += int(np.count_nonzero(mask))
+        self.remove_mask(mask)
+        self.log('fold', *self.cell_corners(cells[dense]))
+
+    def cell_corners(self, cells):
+        """x and y arrays of the top-left and bottom-right corners of cells."""
+        grid = self.grid
+        left = grid.left + cells % grid.cols * grid.cell_size
+        top = grid.top + cells // grid.cols * grid.cell_size
+        return (np.concatenate((left, left + grid.cell_size)).astype(np.float64),
+                np.concatenate((top, top + grid.cell_size)).astype(np.float64))
+
+    def folded_cells(self, left, top, right, bottom):
+        """Numbers of the folded cells overlapping a box."""
+        if not self.folded_count:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.concatenate([np.arange(first, last + 1)
+                                     for first, last in self.grid.row_spans(left, top, right, bottom)])
+        return candidates[self.folded[candidates] > 0]
+
+    def remove_folded(self, left, top, right, bottom, inside):
+        """Remove the share of each folded cell in a box that a cleanup newly covers.
+
+        inside(xs, ys) says which positions the cleanup reaches; it is tried
+        on a grid of samples across each cell. A folded cell's points are
+        taken to lie evenly over the samples no cleanup has covered yet, and
+        the share on newly covered ones is removed, rounding up so reaching a
+        new part of a cell takes at least one point. Returns how many were removed.
+        """
+        cells = self.folded_cells(left, top, right, bottom)
+        if not len(cells):
+            return 0
+        grid = self.grid
+        offsets = (np.arange(FOLD_SAMPLES) + 0.5) * grid.cell_size / FOLD_SAMPLES
+        xs = (grid.left + cells % grid.cols * grid.cell_size)[:, None, None] + offsets[None, None, :]
+        ys = (grid.top + cells // grid.cols * grid.cell_size)[:, None, None] + offsets[None, :, None]
+        covered = inside(xs, ys).reshape(len(cells), -1)
+        swept = self.swept[cells]
+        fresh = np.count_nonzero(covered & ~swept, axis=1)
+        unswept = np.count_nonzero(~swept, axis=1)
+        self.swept[cells] = swept | covered
+        counts = self.folded[cells]
+        removed = np.minimum(counts, np.ceil(counts * fresh / np.maximum(unswept, 1)).astype(np.int64))
+        total = int(removed.sum())
+        if total:
+            self.folded[cells] = counts - removed
+            self.folded_count -= total
+            emptied = cells[(removed > 0) & (removed == counts)]
+            self.swept[emptied] = False
+            self.log('unfold', *self.cell_corners(emptied))
+        return total
+
+    def clear(self):
+        self.count = 0
+        self.folded[:] = 0
+        self.folded_count = 0
+        self.swept[:] = False
+        self.log('clear')
+
+    def log(self, kind, xs=None, ys=None):
+        """Record a change in the journal."""
+        self.revision += 1
+        self.journal.append((self.revision, kind, xs, ys))
+
+    def changes_since(self, revision):
+        """Return journal entries (revision, kind, xs, ys) newer than revision.
+
+        Returns None when the journal no longer reaches back that far.
+        """
+        if revision == self.revision:
+            return []
+        if not self.journal or self.journal[0][0] > revision + 1:
+            return None
+        return [entry for entry in self.journal if entry[0] > revision]
+
+    def copy(self):
+        """Return an independent store holding the same points."""
+        clone = MessStore(capacity=self.count, grid=self.grid, fold_at=self.fold_at)
+        clone.folded[:] = self.folded
+        clone.folded_count = self.folded_count
+        clone.swept[:] = self.swept
+        clone.x[:self.count] = self.x[:self.count]
+        clone.y[:self.count] = self.y[:self.count]
+        clone.cell[:self.count] = self.cell[:self.count]
+        clone.count = self.count
+        clone.uid = self.uid
+        clone.revision = self.revision
+        clone.journal = self.journal.copy()
+        return clone
+
+    def remove_mask(self, mask, start=0):
+        """Drop the points where mask is True and return how many were removed.
+
+        mask covers the points from index start to the end.
+        """
+        removed = int(np.count_nonzero(mask))
+        if removed:
+            self.log('remove', self.x[start:self.count][mask], self.y[start:self.count][mask])
+            keep = ~mask
+            kept = self.count - removed
+            for array in (self.x, self.y, self.cell):
+                array[start:kept] = array[start:self.count][keep]
+            self.count = kept
+        return removed
+
+    def remove_indices(self, indices):
+        """Drop the points at the given sorted indices and return how many were removed."""
+        removed = len(indices)
+        if not removed:
+            return 0
+        if removed > BULK_INSERT:
+            start = int(indices[0])
+            mask = np.zeros(self.count - start, dtype=bool)
+            mask[np.asarray(indices) - start] = True
+            return self.remove_mask(mask, start)
+        self.log('remove', self.x[indices], self.y[indices])
+        # Few removals: slide each run of kept points down over the gaps
+        bounds = np.append(indices, self.count).tolist()
+        for shift in range(1, removed + 1):
+            start, stop = bounds[shift - 1] + 1, bounds[shift]
+            if stop > start:
+                for array in (self.x, self.y, self.cell):
+                    array[start - shift:stop - shift] = array[start:stop]
+        self.count -= removed
+        return removed
+
+    def spans(self, left, top, right, bottom):
+        """Yield (start, stop) index ranges holding the points in cells that overlap a box."""
+        cells = self.cell[:self.count]
+        for first, last in self.grid.row_spans(left, top, right, bottom):
+            # Search with int32 keys so NumPy doesn't cast (and copy) the whole array
+            start = int(cells.searchsorted(np.int32(first), side='left'))
+            stop = int(cells.searchsorted(np.int32(last), side='right'))
+            if stop > start:
+                yield start, stop
+
+    def remove_within(self, pos, radius):
+        """Remove points no further than radius from pos."""
+        px, py = pos
+        limit = radius * radius
+        hits = []
+        for start, stop in self.spans(px - radius, py - radius, px + radius, py + radius):
+            dx = self.x[start:stop] - px
+            dy = self.y[start:stop] - py
+            hits.append(np.flatnonzero(dx * dx + dy * dy <= limit) + start)
+        removed = self.remove_indices(np.concatenate(hits)) if hits else 0
+        if self.folded_count:
+            removed += self.remove_folded(
+                px - radius, py - radius, px + radius, py + radius,
+                lambda xs, ys: (xs - px) ** 2 + (ys - py) ** 2 <= limit)
+        return removed
+
+    def remove_in_rect(self, rect):
+        """Remove points inside rect, using the same edges as Rect.collidepoint for non-negative coordinates."""
+        hits = []
+        for start, stop in self.spans(rect.left, rect.top, rect.right, rect.bottom):
+            x = self.x[start:stop]
+            y = self.y[start:stop]
+            inside = (x >= rect.left) & (x < rect.right) & (y >= rect.top) & (y < rect.bottom)
+            hits.append(np.flatnonzero(inside) + start)
+        removed = self.remove_indices(np.concatenate(hits)) if hits else 0
+        if self.folded_count:
+            removed += self.remove_folded(
+                rect.left, rect.top, rect.right, rect.bottom,
+                lambda xs, ys: (xs >= rect.left) & (xs < rect.right) & (ys >= rect.top) & (ys < rect.bottom))
+        return removed
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pygame
+from particles import SPARKLE, SEED, FEED
+from text import get_font
+
+QUANTILES = (50, 95, 99)
+SUMMARY_INTERVAL = 0.5  # Seconds between percentile refreshes for the overlay
+DUMP_INTERVAL = 1.0     # Seconds between metrics file dumps
+OVERLAY_POS = (30, 110)
+
+
+class RingBuffer:
+    """The most recent samples of one measurement, in a fixed-size array."""
+    def __init__(self, size=600):
+        self.samples = np.zeros(size)
+        self.index = 0
+        self.count = 0
+
+    def add(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def percentiles(self, quantiles=QUANTILES):
+        if not self.count:
+            return [0.0] * len(quantiles)
+        return np.percentile(self.samples[:self.count], quantiles).tolist()
+
+
+class FrameMetrics:
+    """Per-phase timings and entity counts for a running Game.
+
+    instrument() replaces the game's phase methods on the instances with
+    timed wrappers, and uninstrument() removes them again, so an
+    uninstrumented game runs exactly the code it would without this module.
+    """
+    def __init__(self, size=600, dump_path=None):
+        self.size = size
+        self.timers = {}   # phase name -> RingBuffer of seconds
+        self.gauges = {}   # entity kind -> latest count
+        self.wrapped = []  # (object, method name) pairs to restore
+        self.show_overlay = False
+        self.dump_path = dump_path
+        self.last_dump = 0.0
+        self.summary = {}
+        self.last_summary = 0.0
+        self.server = None
+
+    def phases(self, game):
+        """(phase name, object, method name) for every instrumented call."""
+        return [
+            ('frame.input', game, 'handle_input'),
+            ('frame.update', game, 'run_steps'),
+            ('frame.draw', game, 'draw'),
+            ('update.step', game, 'step'),
+            ('update.cleaning', game, 'handle_cleaning'),
+            ('update.pigeons', game.flock, 'update'),
+            ('update.particles', game.particles, 'step'),
+            ('draw.floor', game.floor_layer, 'sync'),
+            ('draw.status', game, 'draw_status'),
+            ('draw.objects', game, 'draw_game_objects'),
+            ('draw.ui', game, 'draw_ui'),
+            ('draw.present', game.renderer, 'present'),
+        ]
+
+    def instrument(self, game):
+        """Start timing the game's phases."""
+        if self.wrapped:
+            return
+        for name, owner, method in self.phases(game):
+            setattr(owner, method, self.timed(name, getattr(owner, method)))
+            self.wrapped.append((owner, method))
+        # Entity counts are sampled once per frame, after drawing
+        draw = game.draw
+
+        def draw_and_sample(*args, **kwargs):
+            draw(*args, **kwargs)
+            self.sample(game)
+        game.draw = draw_and_sample
+
+    def uninstrument(self):
+        """Put the original methods back."""
+        for owner, method in self.wrapped:
+            owner.__dict__.pop(method, None)
+        self.wrapped = []
+
+    def timed(self, name, func):
+        buffer = self.timers.setdefault(name, RingBuffer(self.size))
+        clock = time.perf_counter
+
+        def timed_call(*args, **kwargs):
+            start = clock()
+            result = func(*args, **kwargs)
+            buffer.add(clock() - start)
+            return result
+        return timed_call
+
+    def sample(self, game):
+        """Record entity counts and write the metrics file when one is due."""
+        flock = game.flock
+        particles = game.particles
+        self.gauges.update(
+            pigeons=len(flock),
+            dander=len(flock.dander),
+            droppings=len(flock.droppings),
+            seeds=particles.count(SEED),
+            sparkles=particles.count(SPARKLE),
+            feeding_effects=particles.count(FEED),
+        )
+        now = time.perf_counter()
+        if now - self.last_summary >= SUMMARY_INTERVAL:
+            self.summary = {name: buffer.percentiles() for name, buffer in self.timers.items()}
+            self.last_summary = now
+        if self.dump_path and now - self.last_dump >= DUMP_INTERVAL:
+            self.dump(self.dump_path)
+            self.last_dump = now
+
+    def export(self):
+        """Metrics in the Prometheus text exposition format."""
+        lines = [
+            "# HELP pigeon_phase_seconds Time spent in each frame phase.",
+            "# TYPE pigeon_phase_seconds summary",
+        ]
+        for name, buffer in sorted(self.timers.items()):
+            for q, value in zip(QUANTILES, buffer.percentiles()):
+                lines.append(f'pigeon_phase_seconds{{phase="{name}",quantile="{q / 100}"}} {value:.9f}')
+            lines.append(f'pigeon_phase_seconds_count{{phase="{name}"}} {buffer.count}')
+        lines += [
+            "# HELP pigeon_entities Entities alive in the room.",
+            "# TYPE pigeon_entities gauge",
+        ]
+        for kind, count in sorted(self.gauges.items()):
+            lines.append(f'pigeon_entities{{kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """Write export() to path, replacing the old file in one step."""
+        temp = path + ".tmp"
+        with open(temp, "w") as f:
+            f.write(self.export())
+        os.replace(temp, path)
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve export() over HTTP on a local port from a background thread."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = metrics.export().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+
+    def draw_overlay(self, screen):
+        """Draw the phase percentiles and entity counts; returns the rect drawn."""
+        font = get_font(18)
+        lines = [f"{'phase':<17}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for name in sorted(self.summary):
+            p50, p95, p99 = (value * 1000 for value in self.summary[name])
+            lines.append(f"{name:<17}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}")
+        lines.append("  ".join(f"{kind} {count}" for kind, count in self.gauges.items()))
+        # Rendered directly rather than through the text cache, which these ever-changing lines would churn
+        surfaces = [font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 12
+        height = sum(surface.get_height() for surface in surfaces) + 8
+        rect = pygame.Rect(OVERLAY_POS, (width, height))
+        screen.fill((30, 30, 30), rect)
+        y = rect.top + 4
+        for surface in surfaces:
+            screen.blit(surface, (rect.left + 6, y))
+            y += surface.get_height()
+        return rect
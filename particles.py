@@ -0,0 +1,249 @@
+import math
+import random
+import numpy as np
+import pygame
+from sprites import sprite_cache
+from utils import BASE_RATE
+
+# Particle kinds
+SPARKLE = 0
+SEED = 1
+FEED = 2
+
+# Colors
+SEED_COLOR = (218, 165, 32)
+SPARKLE_COLOR = (255, 255, 200)
+
+SPARKLE_DECAY = 0.05      # Life lost per step
+FEED_DECAY = 0.05
+SEED_FADE = 15 / 255      # Life lost per step while a seed is being eaten
+FEED_PARTICLES = 5        # Crumbs per feeding effect
+
+
+class ParticleSystem:
+    """Sparkles, seeds and feeding crumbs stored in preallocated NumPy columns.
+
+    All particles advance in one vectorized step. Dead slots go on a free
+    list and are handed out again by reserve(), so emitting never allocates
+    once the pool has grown to its working size.
+    """
+    COLUMNS = (
+        ('x', np.float64), ('y', np.float64), ('prev_x', np.float64), ('prev_y', np.float64),
+        ('vx', np.float64), ('vy', np.float64), ('life', np.float64), ('decay', np.float64),
+        ('rotation', np.float64), ('spin', np.float64), ('scale', np.float64),
+        ('target_y', np.float64), ('kind', np.int8), ('alive', np.bool_), ('falling', np.bool_),
+    )
+
+    def __init__(self, capacity=256, rng=None):
+        self.rng = rng if rng is not None else random.Random()  # Shared with the simulation that owns the pool
+        for name, dtype in self.COLUMNS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.size = 0          # Slots ever handed out; columns past this are untouched
+        self.free = []         # Released slots below size, reused first
+        self.live_count = 0
+
+    def __len__(self):
+        return self.live_count
+
+    def grow(self, capacity):
+        for name, dtype in self.COLUMNS:
+            column = np.zeros(capacity, dtype=dtype)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+
+    def reserve(self, count):
+        """Claim count slots and return their indices."""
+        slots = [self.free.pop() for _ in range(min(count, len(self.free)))]
+        extra = count - len(slots)
+        if extra:
+            if self.size + extra > len(self.x):
+                self.grow(max(self.size + extra, len(self.x) * 2))
+            slots.extend(range(self.size, self.size + extra))
+            self.size += extra
+        slots = np.array(slots, dtype=np.intp)
+        self.alive[slots] = True
+        self.falling[slots] = False
+        self.rotation[slots] = 0
+        self.spin[slots] = 0
+        self.scale[slots] = 1
+        self.live_count += count
+        return slots
+
+    def release(self, slots):
+        """Return slots to the free list."""
+        slots = np.asarray(slots, dtype=np.intp)
+        self.alive[slots] = False
+        self.falling[slots] = False
+        self.life[slots] = 0
+        self.decay[slots] = 0
+        self.vx[slots] = 0
+        self.vy[slots] = 0
+        self.spin[slots] = 0
+        self.free.extend(slots.tolist())
+        self.live_count -= len(slots)
+
+    def clear(self):
+        """Release every particle."""
+        self.release(np.flatnonzero(self.alive[:self.size]))
+
+    def place(self, slots, kind, x, y, vx, vy, life, decay):
+        self.kind[slots] = kind
+        self.x[slots] = self.prev_x[slots] = x
+        self.y[slots] = self.prev_y[slots] = y
+        self.vx[slots] = vx
+        self.vy[slots] = vy
+        self.life[slots] = life
+        self.decay[slots] = decay
+
+    def emit_sparkle(self, x, y):
+        """Emit one sparkle drifting away from (x, y)."""
+        slot = self.reserve(1)
+        speed = self.rng.uniform(1, 3)
+        angle = self.rng.uniform(0, 2 * math.pi)
+        self.place(slot, SPARKLE, x, y, math.cos(angle) * speed, math.sin(angle) * speed, 1.0, SPARKLE_DECAY)
+        return int(slot[0])
+
+    def emit_seed(self, x, y, target_y):
+        """Emit a seed that falls from (x, y) and lands at target_y."""
+        slot = self.reserve(1)
+        self.place(slot, SEED, x, y, 0.0, self.rng.uniform(2, 4), 1.0, 0.0)
+        self.target_y[slot] = target_y
+        self.falling[slot] = True
+        self.rotation[slot] = self.rng.uniform(0, 360)
+        self.spin[slot] = self.rng.uniform(-5, 5)
+        self.scale[slot] = self.rng.uniform(0.8, 1.2)
+        return int(slot[0])
+
+    def emit_feeding(self, x, y):
+        """Emit a burst of crumbs from a seed being eaten at (x, y)."""
+        slots = self.reserve(FEED_PARTICLES)
+        for slot in slots.tolist():
+            angle = self.rng.uniform(0, 2 * math.pi)
+            speed = self.rng.uniform(1, 3)
+            # Crumbs drift 20 * speed pixels over their 20-step life
+            self.place(slot, FEED, x, y, math.cos(angle) * speed, math.sin(angle) * speed, 1.0, FEED_DECAY)
+            self.scale[slot] = self.rng.uniform(2, 4)  # Crumb radius
+        return slots
+
+    def prewarm(self):
+        """Build the sparkle and crumb sprites ahead of the first frame that shows one."""
+        sprite_cache.circle(5, 2, 2, SPARKLE_COLOR, 255)
+        for scale in (2, 2.5, 3, 3.5):  # One per distinct crumb sprite size
+            sprite_cache.circle(int(scale * 2), int(scale), int(scale), SEED_COLOR, 255)
+
+    def eat_seed(self, slot):
+        """Start fading out a landed seed."""
+        self.decay[slot] = SEED_FADE
+
+    def being_eaten(self, slot):
+        return self.kind[slot] == SEED and self.decay[slot] > 0
+
+    def step(self, dt):
+        """Advance every particle by dt seconds.
+
+        Returns the slots of seeds that landed during this step.
+        """
+        n = self.size
+        if not self.live_count:
+            return ()
+        steps = dt * BASE_RATE
+        x, y = self.x[:n], self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        x += self.vx[:n] * steps
+        y += self.vy[:n] * steps
+        self.rotation[:n] += self.spin[:n] * steps
+        life = self.life[:n]
+        life -= self.decay[:n] * steps
+
+        landed = self.falling[:n] & (y >= self.target_y[:n])
+        landed = np.flatnonzero(landed)
+        if len(landed):
+            y[landed] = self.target_y[landed]
+            self.vy[landed] = 0
+            self.spin[landed] = 0
+            self.falling[landed] = False
+
+        dead = np.flatnonzero(self.alive[:n] & (life <= 0))
+        if len(dead):
+            self.release(dead)
+        return landed
+
+    def slots(self, kind=None):
+        """Indices of live particles, optionally only of one kind."""
+        alive = self.alive[:self.size]
+        if kind is not None:
+            alive = alive & (self.kind[:self.size] == kind)
+        return np.flatnonzero(alive)
+
+    def resting(self, slots):
+        """Mask of the seed slots that have landed, no longer move and are not being eaten."""
+        return ~self.falling[slots] & (self.decay[slots] == 0) & (self.prev_y[slots] == self.y[slots])
+
+    def resting_seeds(self):
+        """Slots of resting seeds, which look the same every frame until a pigeon eats them."""
+        slots = self.slots(SEED)
+        return slots[self.resting(slots)]
+
+    def count(self, kind=None):
+        return len(self.slots(kind)) if kind is not None else self.live_count
+
+    def copy(self):
+        """Return an independent copy of the live columns, for render snapshots."""
+        clone = ParticleSystem(max(1, self.size), self.rng)
+        for name, _ in self.COLUMNS:
+            getattr(clone, name)[:self.size] = getattr(self, name)[:self.size]
+        clone.size = self.size
+        clone.free = list(self.free)
+        clone.live_count = self.live_count
+        return clone
+
+    def interpolated(self, slots, alpha):
+        """Positions of slots blended alpha of the way into the last step."""
+        px, py = self.prev_x[slots], self.prev_y[slots]
+        return px + (self.x[slots] - px) * alpha, py + (self.y[slots] - py) * alpha
+
+    def bounds(self, margin=8, resting=True):
+        """One screen rect per particle kind, covering its live particles at any alpha.
+
+        resting=False leaves out resting seeds, for a caller that draws them elsewhere.
+        """
+        rects = []
+        for kind in (SPARKLE, SEED, FEED):
+            slots = self.slots(kind)
+            if kind == SEED and not resting:
+                slots = slots[~self.resting(slots)]
+            if not len(slots):
+                continue
+            xs = np.concatenate((self.x[slots], self.prev_x[slots]))
+            ys = np.concatenate((self.y[slots], self.prev_y[slots]))
+            left, top = int(xs.min()) - margin, int(ys.min()) - margin
+            rects.append(pygame.Rect(left, top, int(xs.max()) + margin - left + 1, int(ys.max()) + margin - top + 1))
+        return rects
+
+    def sprites(self, kind, alpha=1.0, resting=True):
+        """(sprite, position) pairs for the live particles of one kind, for Surface.blits()."""
+        slots = self.slots(kind)
+        if kind == SEED and not resting:
+            slots = slots[~self.resting(slots)]
+        if not len(slots):
+            return []
+        xs, ys = self.interpolated(slots, alpha)
+        if kind == SEED:
+            return sprite_cache.seed_batch(xs, ys, 3 * self.scale[slots], self.rotation[slots],
+                                           SEED_COLOR, 255 * self.life[slots])
+        batch = []
+        for x, y, life, scale in zip(xs.tolist(), ys.tolist(), self.life[slots].tolist(), self.scale[slots].tolist()):
+            if kind == SPARKLE:
+                sprite = sprite_cache.circle(5, 2, 2, SPARKLE_COLOR, 255 * life)
+                pos = (int(x), int(y))
+            else:
+                sprite = sprite_cache.circle(int(scale * 2), int(scale), int(scale), SEED_COLOR, int(255 * life))
+                pos = (int(x - scale), int(y - scale))
+            if sprite:
+                batch.append((sprite, pos))
+        return batch
+
+    def draw_seeds(self, surface, alpha=1.0, resting=True):
+        """Draw seeds from pre-rotated sprites; resting=False leaves out resting ones."""
+        surface.blits(self.sprites(SEED, alpha, resting), doreturn=False)
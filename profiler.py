@@ -0,0 +1,134 @@
+import json
+import os
+import sys
+import threading
+from collections import Counter
+
+DEFAULT_INTERVAL = 0.005  # Seconds between samples
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def game_mode(game):
+    """The mode a frame is attributed to: the active tool, playing, or idle."""
+    if game.cloth_mode:
+        return "cloth_mode"
+    if game.vacuum_mode:
+        return "vacuum_mode"
+    if game.feed_mode:
+        return "feed_mode"
+    if game.ball:
+        return "playing"
+    return "idle"
+
+
+def frame_name(code):
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """Samples the Python stacks of chosen threads from a background thread.
+
+    Every interval it reads the current frame of each target thread, so the
+    profiled code runs unmodified and pays only for the interpreter switching
+    to the sampler now and then. Each stack is rooted at the game mode at the
+    time of the sample, so a hot spot shows up under the mode it happens in.
+    """
+    def __init__(self, game, interval=DEFAULT_INTERVAL, thread_names=("MainThread", "simulation")):
+        self.game = game
+        self.interval = interval
+        self.thread_names = thread_names
+        self.stacks = Counter()  # (mode, thread, frame, ...) root first -> samples
+        self.frames = {}         # frame name -> (file, first line)
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.switch_interval = None
+
+    def start(self):
+        # The sampler can only run when the GIL changes hands, which by default
+        # is every 5 ms or at the next blocking call; left alone, nearly every
+        # sample would land in the display flip where the game loop blocks
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.switch_interval, self.interval / 10))
+        self.thread = threading.Thread(target=self.sample_loop, name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread:
+            self.thread.join()
+            self.thread = None
+        if self.switch_interval is not None:
+            sys.setswitchinterval(self.switch_interval)
+            self.switch_interval = None
+
+    def sample_loop(self):
+        while not self.stop_event.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        """Record one stack for each target thread that is running."""
+        frames = sys._current_frames()
+        mode = game_mode(self.game)
+        for thread in threading.enumerate():
+            if thread.name not in self.thread_names:
+                continue
+            frame = frames.get(thread.ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                name = frame_name(code)
+                if name not in self.frames:
+                    self.frames[name] = (code.co_filename, code.co_firstlineno)
+                stack.append(name)
+                frame = frame.f_back
+            if stack:
+                stack.append(thread.name)
+                stack.append(mode)
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def collapsed(self):
+        """Samples in the collapsed-stack format read by flamegraph.pl and speedscope."""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def speedscope(self):
+        """Samples as a speedscope sampled profile, weighted in seconds."""
+        index = {}
+        frames = []
+        samples = []
+        weights = []
+        for stack, count in sorted(self.stacks.items()):
+            sample = []
+            for name in stack:
+                if name not in index:
+                    index[name] = len(frames)
+                    frame = {"name": name}
+                    if name in self.frames:
+                        frame["file"], frame["line"] = self.frames[name]
+                    frames.append(frame)
+                sample.append(index[name])
+            samples.append(sample)
+            weights.append(count * self.interval)
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "name": "Pigeon Simulator",
+            "exporter": "pigeon profiler",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": "game loop",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+    def write(self, path):
+        """Write speedscope JSON if path ends in .json, otherwise collapsed stacks."""
+        with open(path, "w") as f:
+            if path.endswith(".json"):
+                json.dump(self.speedscope(), f)
+            else:
+                f.write(self.collapsed())
@@ -0,0 +1,123 @@
+import pygame
+from text import render_text
+
+OUTLINE_COLOR = (255, 0, 0)
+
+
+def merge_rects(rects):
+    """Union overlapping rects so each region is pushed once."""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        hit = rect.collidelist(merged)
+        while hit != -1:
+            rect.union_ip(merged.pop(hit))
+            hit = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+class DirtyRenderer:
+    """Draws frames by touching only the screen regions that changed.
+
+    The window fill and button chrome are composited once into a static
+    background, and the floor comes from the FloorLayer. Each frame starts
+    by restoring the regions drawn last frame from those two; moving
+    elements are then drawn again and marked, and only the old and new
+    regions are sent to pygame.display.update().
+    """
+    def __init__(self, screen, background, floor_layer):
+        self.screen = screen
+        self.background = background
+        self.floor_layer = floor_layer
+        self.previous = []   # Marked last frame, erased at the start of this one
+        self.current = []    # Marked this frame
+        self.pushed = []     # Redrawn this frame but left in place afterwards
+        self.restored = []
+        self.full_redraw = True
+        self.show_dirty = False
+        self.pushed_rects = 0
+        self.pushed_pixels = 0
+        self.stale_outlines = []
+
+    def invalidate(self):
+        """Redraw and push the whole window next frame."""
+        self.full_redraw = True
+
+    def restore(self, rect):
+        """Repaint rect from the static background and the floor layer."""
+        rect = pygame.Rect(rect).clip(self.screen.get_rect())
+        if not rect:
+            return
+        self.screen.blit(self.background, rect, rect)
+        floor = self.floor_layer.rect.clip(rect)
+        if floor:
+            self.screen.blit(self.floor_layer.surface, floor, floor.move(0, -self.floor_layer.rect.top))
+
+    def begin(self):
+        """Start a frame by erasing everything marked in the last one."""
+        self.restored = [self.screen.get_rect()] if self.full_redraw else self.previous
+        for rect in self.restored:
+            self.restore(rect)
+        self.current = []
+        self.pushed = []
+
+    def touched(self, rect):
+        """Whether begin() repainted any part of rect this frame."""
+        return pygame.Rect(rect).collidelist(self.restored) != -1
+
+    def mark(self, rect):
+        """Record a region drawn this frame that must be erased next frame."""
+        rect = pygame.Rect(rect).clip(self.screen.get_rect())
+        if rect:
+            self.current.append(rect)
+
+    def push(self, rect):
+        """Record a region that changed this frame and stays as drawn."""
+        rect = pygame.Rect(rect).clip(self.screen.get_rect())
+        if rect:
+            self.pushed.append(rect)
+
+    def present(self):
+        """Send the changed regions to the display."""
+        outlines = self.draw_overlay() if self.show_dirty else []
+        if self.full_redraw:
+            regions = [self.screen.get_rect()]
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            regions = merge_rects(self.previous + self.current + self.pushed)
+            # Last frame's outlines are already gone from the screen surface, but not the display
+            pygame.display.update(regions + self.stale_outlines)
+        self.pushed_rects = len(regions)
+        self.pushed_pixels = sum(rect.width * rect.height for rect in regions)
+        self.previous = self.current
+
+        # Take the outlines back off the screen surface so nothing else has to erase them;
+        # newest first, since later strips saved pixels of earlier outlines
+        for pixels, strip in reversed(outlines):
+            self.screen.blit(pixels, strip)
+        self.stale_outlines = [strip for _, strip in outlines]
+
+    def draw_overlay(self):
+        """Outline this frame's dirty regions and show last frame's push size.
+
+        Returns the (saved pixels, strip) pairs covered by the outlines.
+        """
+        outlines = []
+        for rect in self.current + self.pushed:
+            for strip in (
+                (rect.left, rect.top, rect.width, 1), (rect.left, rect.bottom - 1, rect.width, 1),
+                (rect.left, rect.top, 1, rect.height), (rect.right - 1, rect.top, 1, rect.height),
+            ):
+                strip = pygame.Rect(strip)
+                outlines.append((self.screen.subsurface(strip).copy(), strip))
+            pygame.draw.rect(self.screen, OUTLINE_COLOR, rect, 1)
+        width, height = self.screen.get_size()
+        share = 100 * self.pushed_pixels / (width * height)
+        text = render_text(f"dirty: {self.pushed_rects} rects, {self.pushed_pixels:,} px ({share:.1f}%)",
+                           20, OUTLINE_COLOR)
+        pos = (width - text.get_width() - 10, height - text.get_height() - 4)
+        self.screen.blit(text, pos)
+        self.mark(text.get_rect(topleft=pos))
+        return outlines
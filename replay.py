@@ -0,0 +1,118 @@
+import hashlib
+import struct
+import time
+from simulation import Simulation, InputState
+
+MAGIC = b'PGNLOG'
+VERSION = 1
+HEADER = struct.Struct('<6sBQdH')   # magic, version, RNG seed, step length in seconds, flock size
+RUN = struct.Struct('<HhhBB')       # ticks, mouse x, mouse y, button down, clicks in the run's first tick
+CLICK = struct.Struct('<hh')
+TRAILER = struct.Struct('<3sQ20s')  # b'END', ticks recorded, state digest after the last tick
+MAX_RUN = 0xFFFF
+
+
+def state_digest(sim):
+    """SHA-1 of the simulation state that replays must reproduce exactly."""
+    digest = hashlib.sha1()
+    flock = sim.flock
+    for name, _ in flock.COLUMNS:
+        digest.update(getattr(flock, name)[:flock.count].tobytes())
+    for store in (flock.dander, flock.droppings):
+        digest.update(store.x[:store.count].tobytes())
+        digest.update(store.y[:store.count].tobytes())
+        digest.update(store.folded.tobytes())
+    particles = sim.particles
+    for name in ('x', 'y', 'life', 'alive'):
+        digest.update(getattr(particles, name)[:particles.size].tobytes())
+    digest.update(struct.pack('<ddq', sim.clock.get_ticks(), sim.combo_multiplier, sim.cleaning_score))
+    return digest.digest()
+
+
+class InputRecorder:
+    """Writes per-tick input to a compact binary log.
+
+    Ticks with the same mouse state and no clicks are stored as one run, so
+    a session where the mouse sits still costs a few bytes.
+    """
+    def __init__(self, path, seed, dt, flock_size=1):
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, dt, flock_size))
+        self.run = None  # [ticks, x, y, down, clicks]
+        self.ticks = 0
+
+    def record(self, input_state):
+        """Log the input for one tick."""
+        x, y = input_state.mouse_pos
+        down = int(bool(input_state.mouse_down))
+        run = self.run
+        if (run and not input_state.clicks and run[0] < MAX_RUN
+                and run[1] == x and run[2] == y and run[3] == down):
+            run[0] += 1
+        else:
+            self.flush()
+            self.run = [1, x, y, down, list(input_state.clicks)]
+        self.ticks += 1
+
+    def flush(self):
+        if self.run:
+            ticks, x, y, down, clicks = self.run
+            self.file.write(RUN.pack(ticks, x, y, down, len(clicks)))
+            for click in clicks:
+                self.file.write(CLICK.pack(*click))
+            self.run = None
+
+    def close(self, sim):
+        """Finish the log with the tick count and the final state digest of sim."""
+        self.flush()
+        self.file.write(TRAILER.pack(b'END', self.ticks, state_digest(sim)))
+        self.file.close()
+
+
+class InputLog:
+    """A recorded session: its header fields and the InputState for every tick."""
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, self.seed, self.dt, self.flock_size = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input log")
+        self.data = data
+        self.offset = HEADER.size
+        self.end = len(data) - TRAILER.size
+        tag, self.ticks, self.digest = TRAILER.unpack_from(data, self.end)
+        if tag != b'END':
+            raise ValueError(f"{path} is truncated")
+
+    def __iter__(self):
+        """Yield one InputState per recorded tick."""
+        data = self.data
+        offset = self.offset
+        while offset < self.end:
+            ticks, x, y, down, count = RUN.unpack_from(data, offset)
+            offset += RUN.size
+            clicks = [CLICK.unpack_from(data, offset + i * CLICK.size) for i in range(count)]
+            offset += count * CLICK.size
+            yield InputState((x, y), bool(down), clicks)
+            if ticks > 1:
+                still = InputState((x, y), bool(down))
+                for _ in range(ticks - 1):
+                    yield still
+
+
+def replay(path):
+    """Re-run a recorded session headless, as fast as possible.
+
+    Returns the simulation, the achieved ticks per second and whether the
+    final state matches the recording bit for bit.
+    """
+    log = InputLog(path)
+    sim = Simulation(flock_size=log.flock_size, seed=log.seed)
+    step = sim.step
+    dt = log.dt
+    start = time.perf_counter()
+    for input_state in log:
+        step(dt, input_state)
+    elapsed = time.perf_counter() - start
+    rate = log.ticks / elapsed if elapsed > 0 else float('inf')
+    return sim, rate, state_digest(sim) == log.digest
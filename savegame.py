@@ -0,0 +1,206 @@
+import mmap
+import os
+import struct
+import threading
+import time
+import numpy as np
+from classes import Pigeon, Ball
+from particles import SEED
+
+MAGIC = b'PGNSAV'
+VERSION = 2                           # 2 added the folded mess cell counts
+HEADER = struct.Struct('<6sBxI')      # magic, version, section count
+SECTION = struct.Struct('<32s4sQQ')   # name, NumPy dtype string, byte offset, item count
+ALIGN = 8                             # Sections start on 8-byte boundaries so they map as aligned arrays
+AUTOSAVE_INTERVAL = 30.0              # Seconds between autosaves
+CATCH_UP_AFTER = 5 * 60.0             # Seconds away before resuming fast-forwards the room
+
+BALL_FIELDS = ('x', 'y', 'prev_x', 'prev_y', 'dx', 'dy', 'being_pushed', 'push_timer')
+TEXT_COLUMNS = ('action', 'action_message')
+
+
+def capture(sim):
+    """Copy everything a save holds into {section name: array}.
+
+    Only slices of the existing columns are copied, so this is cheap enough
+    to run inside a frame; the copies can then be written from any thread.
+    """
+    sections = {
+        'sim': np.array([sim.clock.get_ticks(), sim.cleaning_score, sim.combo_multiplier,
+                         sim.last_clean_time, time.time()], dtype=np.float64),
+    }
+    ball = sim.ball
+    sections['ball'] = (np.array([getattr(ball, name) for name in BALL_FIELDS], dtype=np.float64)
+                        if ball else np.empty(0))
+
+    flock = sim.flock
+    n = flock.count
+    for name, _ in flock.COLUMNS:
+        sections['flock.' + name] = getattr(flock, name)[:n].copy()
+    for name in TEXT_COLUMNS:
+        text = "\n".join(getattr(flock, name)).encode()
+        sections['flock.' + name] = np.frombuffer(text, dtype=np.uint8).copy()
+    for name in ('dander', 'droppings'):
+        store = getattr(flock, name)
+        sections[name + '.x'] = store.x[:store.count].copy()
+        sections[name + '.y'] = store.y[:store.count].copy()
+        sections[name + '.folded'] = store.folded.copy()
+
+    particles = sim.particles
+    for name, _ in particles.COLUMNS:
+        sections['particles.' + name] = getattr(particles, name)[:particles.size].copy()
+    return sections
+
+
+def write_save(path, sections):
+    """Write sections to path: a header, a section table, then the raw arrays.
+
+    The file is written beside path, synced to disk and renamed over it, so
+    a crash mid-save leaves the previous save intact.
+    """
+    table = []
+    offset = HEADER.size + SECTION.size * len(sections)
+    for name, array in sections.items():
+        offset += -offset % ALIGN
+        table.append((name, array, offset))
+        offset += array.nbytes
+
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(sections)))
+        for name, array, offset in table:
+            f.write(SECTION.pack(name.encode(), array.dtype.str.encode(), offset, len(array)))
+        for name, array, offset in table:
+            f.write(b'\0' * (offset - f.tell()))
+            f.write(array.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+
+
+def read_save(path):
+    """Map a save file and return {section name: array} viewing it in place.
+
+    The arrays are read-only views into the mapping, so nothing is parsed
+    up front however large the room is.
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, count = HEADER.unpack_from(data)
+    # Version 1 saves differ only in lacking the folded sections, which restore() treats as empty
+    if magic != MAGIC or not 1 <= version <= VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} save")
+    sections = {}
+    for i in range(count):
+        name, dtype, offset, length = SECTION.unpack_from(data, HEADER.size + i * SECTION.size)
+        sections[name.rstrip(b'\0').decode()] = np.frombuffer(
+            data, dtype=dtype.rstrip(b'\0').decode(), count=length, offset=offset)
+    return sections
+
+
+def restore(sim, sections):
+    """Replace the room state of sim with a save's sections.
+
+    Returns the wall-clock time the save was captured at, or None for saves
+    written before that was recorded.
+    """
+    values = sections['sim'].tolist()
+    sim.clock.time, sim.cleaning_score, sim.combo_multiplier, sim.last_clean_time = values[:4]
+    sim.cleaning_score = int(sim.cleaning_score)
+    sim.messages = []
+
+    sim.ball = None
+    if len(sections['ball']):
+        ball = sim.ball = Ball(0, 0, clock=sim.clock.get_ticks, rng=sim.rng)
+        for name, value in zip(BALL_FIELDS, sections['ball'].tolist()):
+            setattr(ball, name, value)
+        ball.being_pushed = bool(ball.being_pushed)
+
+    flock = sim.flock
+    n = len(sections['flock.x'])
+    while flock.count > n:
+        flock.remove(flock.count - 1)
+    while flock.count < n:
+        Pigeon(0, 0, flock=flock)
+    for name, _ in flock.COLUMNS:
+        getattr(flock, name)[:n] = sections['flock.' + name]
+    for name in TEXT_COLUMNS:
+        text = sections['flock.' + name].tobytes().decode()
+        setattr(flock, name, text.split("\n") if n else [])
+    # Seed claims are re-made on the next step; a ball game resumes with the saved ball
+    flock.target_slot[:n] = -1
+    flock.target_seed = [None] * n
+    flock.target_ball = [sim.ball if playing else None for playing in flock.playing_with_ball[:n].tolist()]
+    sim.events.reset(flock.pigeons)
+    for name in ('dander', 'droppings'):
+        store = getattr(flock, name)
+        store.clear()
+        store.extend(np.column_stack((sections[name + '.x'], sections[name + '.y'])))
+        if name + '.folded' in sections:
+            store.folded[:] = sections[name + '.folded']
+        store.folded_count = int(store.folded.sum())
+
+    particles = sim.particles
+    size = len(sections['particles.x'])
+    particles.clear()
+    if size > len(particles.x):
+        particles.grow(size)
+    for name, _ in particles.COLUMNS:
+        getattr(particles, name)[:size] = sections['particles.' + name]
+    alive = particles.alive[:size]
+    particles.size = size
+    particles.live_count = int(alive.sum())
+    particles.free = np.flatnonzero(~alive).tolist()[::-1]
+
+    # Only seeds still waiting on the floor can be found; ones being eaten are already spoken for
+    sim.seed_grid.clear()
+    landed = np.flatnonzero(alive & (particles.kind[:size] == SEED) & ~particles.falling[:size]
+                            & (particles.decay[:size] == 0))
+    for slot in landed.tolist():
+        sim.seed_grid.insert(slot, particles.x[slot], particles.y[slot])
+    return values[4] if len(values) > 4 else None
+
+
+def save(sim, path):
+    write_save(path, capture(sim))
+
+
+def load(sim, path):
+    return restore(sim, read_save(path))
+
+
+class Autosaver:
+    """Saves a simulation to one file every interval seconds without stalling it.
+
+    The frame only pays for capture(); writing and syncing the file happen
+    on a background thread. If a write is still going when the next save is
+    due, that save waits for the following frame.
+    """
+    def __init__(self, path, interval=AUTOSAVE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.last_save = time.perf_counter()
+        self.writer = None
+
+    def maybe_save(self, sim):
+        """Start a save if one is due and the last has finished."""
+        now = time.perf_counter()
+        if now - self.last_save >= self.interval and not self.busy:
+            self.save(sim)
+
+    @property
+    def busy(self):
+        return self.writer is not None and self.writer.is_alive()
+
+    def save(self, sim):
+        self.last_save = time.perf_counter()
+        self.writer = threading.Thread(target=write_save, args=(self.path, capture(sim)),
+                                       name="autosave", daemon=True)
+        self.writer.start()
+
+    def close(self, sim):
+        """Wait for any write in progress, then save the final state."""
+        if self.writer:
+            self.writer.join()
+            self.writer = None
+        save(sim, self.path)
@@ -0,0 +1,50 @@
+import time
+
+
+class FixedStepScheduler:
+    """Accumulator that turns variable frame times into fixed-size simulation steps."""
+    def __init__(self, rate=60, max_steps=5):
+        self.set_rate(rate)
+        self.max_steps = max_steps  # Cap on steps per frame so a stalled frame can't snowball
+        self.time_scale = 1.0
+        self.accumulator = 0.0
+
+    def set_rate(self, rate):
+        """Change how many simulation steps run per second."""
+        self.rate = rate
+        self.dt = 1.0 / rate
+
+    def advance(self, elapsed):
+        """Add elapsed seconds and return how many steps are due now."""
+        self.accumulator += elapsed * self.time_scale
+        steps = int(self.accumulator / self.dt)
+        limit = max(self.max_steps, int(self.max_steps * self.time_scale))
+        if steps > limit:
+            # Drop the backlog rather than trying to catch up after a long stall
+            steps = limit
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.dt
+        return steps
+
+    @property
+    def alpha(self):
+        """Fraction of a step left in the accumulator, used to interpolate drawing."""
+        return min(1.0, self.accumulator / self.dt)
+
+
+class TickRateMeter:
+    """Counts simulation steps and reports the achieved rate about once a second."""
+    def __init__(self, window=1.0):
+        self.window = window
+        self.count = 0
+        self.window_start = time.perf_counter()
+        self.rate = 0.0
+
+    def add(self, ticks):
+        self.count += ticks
+        now = time.perf_counter()
+        if now - self.window_start >= self.window:
+            self.rate = self.count / (now - self.window_start)
+            self.count = 0
+            self.window_start = now
@@ -0,0 +1,279 @@
+import random
+import time
+import numpy as np
+import pygame
+from classes import Pigeon, Ball, PLAYED_MESSAGE
+from events import EventManager
+from flock import Flock
+from mess import DENSE_CELL
+from particles import ParticleSystem, SEED
+from spatial import SpatialGrid
+from utils import WINDOW_WIDTH, WINDOW_HEIGHT, ROOM_TOP, ROOM_BOTTOM, WALL_THICKNESS
+
+
+class SimulationClock:
+    """Millisecond clock that only moves when the simulation steps it."""
+    def __init__(self, start=0):
+        self.time = start
+
+    def advance(self, ms):
+        self.time += ms
+
+    def get_ticks(self):
+        return self.time
+
+
+class InputState:
+    """Player input for a single simulation step."""
+    __slots__ = ('mouse_pos', 'mouse_down', 'clicks')
+
+    def __init__(self, mouse_pos=(0, 0), mouse_down=False, clicks=()):
+        self.mouse_pos = mouse_pos
+        self.mouse_down = mouse_down
+        self.clicks = clicks  # Positions of mouse clicks since the last step
+
+
+NO_INPUT = InputState()
+
+
+class Simulation:
+    """Game state and rules, advanced explicitly with step() and free of any display."""
+    combo_window = 2000  # ms between cleanups that keeps a combo going
+    combo_step = 0.5     # Multiplier gained per cleanup within the window
+    max_combo = 4.0
+    max_messages = 20  # Older messages are dropped once this many have piled up
+    def __init__(self, clock=None, flock_size=1, seed=None, fold_at=DENSE_CELL):
+        # All randomness comes from this generator, so a seed makes runs repeatable
+        # without touching the random module other simulations may be using
+        self.rng = random.Random(seed)
+        self.clock = clock or SimulationClock()
+
+        # Game objects; sparkles, seeds and the pigeons' feeding crumbs share one particle pool
+        self.particles = ParticleSystem(rng=self.rng)
+        self.flock = Flock(self.clock.get_ticks, self.particles, fold_at=fold_at, rng=self.rng)
+        self.pigeon = Pigeon(WINDOW_WIDTH // 2, (ROOM_TOP + ROOM_BOTTOM) // 2, flock=self.flock)
+        for _ in range(flock_size - 1):
+            Pigeon(self.rng.uniform(71, 729), self.rng.uniform(71, 449), flock=self.flock)
+        self.messages = []
+        self.ball = None
+
+        # Random pigeon events run on the simulation clock and draw from its generator
+        self.events = EventManager(self.clock.get_ticks, rng=self.rng)
+        self.events.reset(self.flock.pigeons)
+
+        # Spatial index of landed seeds, by particle slot. Pigeons are found by
+        # scanning the flock's position columns, and there is only ever one ball.
+        self.seed_grid = SpatialGrid()
+
+        # UI elements
+        self.setup_buttons()
+
+        # Game modes
+        self.cloth_mode = False
+        self.vacuum_mode = False
+        self.feed_mode = False
+
+        self.last_clean_time = 0
+        self.cleaning_score = 0
+        self.combo_multiplier = 1.0
+
+    def setup_buttons(self):
+        """Lay out the tool buttons below the room."""
+        button_y = ROOM_BOTTOM + 20  # Place buttons below room
+        button_width = 100
+        button_spacing = 30
+        start_x = (WINDOW_WIDTH - (4 * button_width + 3 * button_spacing)) // 2
+
+        self.vacuum_button = pygame.Rect(start_x, button_y, button_width, 50)
+        self.cloth_button = pygame.Rect(start_x + button_width + button_spacing, button_y, button_width, 50)
+        self.feed_button = pygame.Rect(start_x + 2 * (button_width + button_spacing), button_y, button_width, 50)
+        self.play_button = pygame.Rect(start_x + 3 * (button_width + button_spacing), button_y, button_width, 50)
+
+    def handle_click(self, pos):
+        """Handle mouse click events."""
+        if self.play_button.collidepoint(pos):
+            if not self.ball or not self.pigeon.playing_with_ball:
+                self.ball = Ball(WINDOW_WIDTH // 2, (ROOM_TOP + ROOM_BOTTOM) // 2, clock=self.clock.get_ticks, rng=self.rng)
+                self.pigeon.start_playing(self.ball)
+        elif self.feed_button.collidepoint(pos):
+            self.feed_mode = True
+            self.cloth_mode = False
+            self.vacuum_mode = False
+        elif self.cloth_button.collidepoint(pos):
+            self.cloth_mode = not self.cloth_mode
+            self.feed_mode = False
+            self.vacuum_mode = False
+        elif self.vacuum_button.collidepoint(pos):
+            self.vacuum_mode = not self.vacuum_mode
+            self.cloth_mode = False
+            self.feed_mode = False
+        elif self.feed_mode:
+            self.handle_feed(pos)
+        elif not any([self.cloth_mode, self.vacuum_mode, self.feed_mode]):
+            self.handle_pet(pos)
+
+    def handle_feed(self, pos):
+        """Handle feed mode interaction."""
+        num_seeds = self.rng.randint(8, 12)
+        scatter_radius = 20
+        for _ in range(num_seeds):
+            seed_x = pos[0] + self.rng.uniform(-scatter_radius, scatter_radius)
+            seed_y = pos[1] - self.rng.uniform(20, 40)
+            target_y = pos[1] + self.rng.uniform(-5, 5)
+            self.particles.emit_seed(seed_x, seed_y, target_y)
+        self.feed_mode = False
+
+    def handle_pet(self, pos):
+        """Handle petting interaction."""
+        for row in self.flock.rows_within(pos, 50).tolist():
+            self.flock.pigeons[row].start_petting()
+
+    def handle_cleaning(self, pos, cleaning_active):
+        """Handle cleaning mode interactions."""
+        if cleaning_active:
+            if self.cloth_mode:
+                self.handle_cloth_cleaning(pos)
+            elif self.vacuum_mode:
+                self.handle_vacuum_cleaning(pos)
+
+    def handle_cloth_cleaning(self, pos):
+        """Handle cloth cleaning interaction."""
+        cloth_rect = pygame.Rect(pos[0] - 20, pos[1] - 20, 40, 40)
+        cleaned_count = self.flock.droppings.remove_in_rect(cloth_rect)
+        if cleaned_count > 0:
+            self.update_cleaning_score(cleaned_count * 10)
+            self.particles.emit_sparkle(pos[0], pos[1])
+
+    def handle_vacuum_cleaning(self, pos):
+        """Handle vacuum cleaning interaction."""
+        vacuum_radius = 25
+        cleaned_count = self.flock.dander.remove_within(pos, vacuum_radius)
+        if cleaned_count > 0:
+            self.update_cleaning_score(cleaned_count * 5)
+            self.particles.emit_sparkle(pos[0], pos[1])
+
+    def update_cleaning_score(self, points):
+        """Update cleaning score and combo."""
+        current_time = self.clock.get_ticks()
+        if current_time - self.last_clean_time <= self.combo_window:
+            self.combo_multiplier = min(self.combo_multiplier + self.combo_step, self.max_combo)
+        else:
+            self.combo_multiplier = 1.0
+        self.last_clean_time = current_time
+        self.cleaning_score += int(points * self.combo_multiplier)
+
+    def catch_up(self, seconds):
+        """Fast-forward an unattended session by seconds in one call.
+
+        Seeds left on the floor are eaten, transient effects and the ball are
+        cleared, and the pigeon's stats and mess are advanced analytically.
+        """
+        self.clock.advance(seconds * 1000)
+        pigeon = self.pigeon
+        particles = self.particles
+        for slot in particles.slots(SEED).tolist():
+            if not particles.being_eaten(slot):
+                pigeon.hunger = max(0, pigeon.hunger - 10)
+                pigeon.happiness = min(100, pigeon.happiness + 5)
+        particles.clear()
+        self.seed_grid.clear()
+        self.flock.target_slot[:] = -1
+        self.ball = None
+        for bird in self.flock.pigeons:
+            bird.catch_up(seconds * 1000)
+        self.events.reset(self.flock.pigeons)
+
+    def seek_seeds(self, pigeon, claimed):
+        """Let a pigeon eat the nearest seed in reach, or walk on to the seed it has claimed.
+
+        A pigeon without a live target claims the nearest unclaimed seed it can
+        see and sticks with it until that seed is eaten.
+        """
+        particles = self.particles
+        seed_grid = self.seed_grid
+        flock, row = pigeon.flock, pigeon.row
+        x, y = flock.x.item(row), flock.y.item(row)
+        target = flock.target_slot.item(row)
+
+        # If pigeon is close enough to eat
+        hit = seed_grid.nearest(x, y, 50)
+        if hit is not None and hit[0] < 50 * 50:
+            slot = hit[1]
+            pigeon.eat_seed((float(particles.x[slot]), float(particles.y[slot])), slot)
+            seed_grid.remove(slot)
+            if slot == target:
+                flock.target_slot[row] = -1
+            return
+
+        if target < 0 or target not in seed_grid:
+            # If a seed is visible and not too far, claim it
+            hit = seed_grid.nearest(x, y, 200, claimed)
+            if hit is None:
+                flock.target_slot[row] = -1
+                return
+            target = flock.target_slot[row] = hit[1]
+            claimed.add(target)
+        pigeon.move_towards_seed((float(particles.x[target]), float(particles.y[target])))
+
+    def step(self, dt, input_state=NO_INPUT):
+        """Advance the simulation by dt seconds using the given input."""
+        self.clock.advance(dt * 1000)
+
+        for pos in input_state.clicks:
+            self.handle_click(pos)
+        self.handle_cleaning(input_state.mouse_pos, input_state.mouse_down)
+
+        self.flock.update(dt)
+
+        # Random events post their messages for the player
+        triggered = self.events.check_events()
+        if triggered:
+            messages = self.messages
+            messages.extend(message for _, message in triggered)
+            del messages[:-self.max_messages]
+
+        # Update particles; landed seeds join the grid so pigeons can find them
+        particles = self.particles
+        for slot in particles.step(dt):
+            slot = int(slot)
+            self.seed_grid.insert(slot, particles.x[slot], particles.y[slot])
+
+        # Check nearby seeds for eating
+        if self.seed_grid:
+            flock = self.flock
+            claimed = flock.claimed_seeds()
+            for row in np.flatnonzero(~flock.is_eating[:flock.count]).tolist():
+                self.seek_seeds(flock.pigeons[row], claimed)
+
+        # Update ball if it exists
+        if self.ball:
+            self.ball.update(WINDOW_WIDTH, WINDOW_HEIGHT, WALL_THICKNESS, dt)
+
+            # Check if ball should be removed
+            edge_margin = 50
+            near_edge = (
+                self.ball.x <= WALL_THICKNESS + edge_margin or
+                self.ball.x >= WINDOW_WIDTH - WALL_THICKNESS - edge_margin or
+                self.ball.y <= ROOM_TOP + edge_margin or #Corrected y-coordinate check
+                self.ball.y >= ROOM_BOTTOM - WALL_THICKNESS - edge_margin
+            )
+
+            # Only remove if ball has been pushed and is near edge
+            if not self.ball.being_pushed and near_edge and self.pigeon.playing_with_ball:
+                self.ball = None
+                self.pigeon.playing_with_ball = False
+                self.pigeon.action_message = PLAYED_MESSAGE
+
+
+def run_headless(ticks, dt=1 / 60, input_state=NO_INPUT, sim=None):
+    """Step a simulation for a number of ticks without a window.
+
+    Returns the simulation and the achieved ticks per second.
+    """
+    sim = sim or Simulation()
+    step = sim.step
+    start = time.perf_counter()
+    for _ in range(ticks):
+        step(dt, input_state)
+    elapsed = time.perf_counter() - start
+    return sim, ticks / elapsed if elapsed > 0 else float('inf')
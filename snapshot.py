@@ -0,0 +1,54 @@
+import copy
+import threading
+import time
+from collections import namedtuple
+
+# Everything the renderer needs from one simulation step. The entities are
+# private copies, so drawing never sees the simulation mid-update.
+RenderSnapshot = namedtuple('RenderSnapshot', [
+    'pigeon', 'flock', 'particles', 'ball', 'messages',
+    'cloth_mode', 'vacuum_mode', 'feed_mode',
+    'cleaning_score', 'combo_multiplier',
+    'sim_time', 'published_at',
+])
+
+
+def take_snapshot(sim):
+    """Copy the drawable state of a simulation into a RenderSnapshot."""
+    flock = sim.flock.copy(particles=sim.particles.copy())
+    return RenderSnapshot(
+        pigeon=flock.pigeons[sim.pigeon.row],
+        flock=flock,
+        particles=flock.particles,
+        ball=copy.copy(sim.ball) if sim.ball else None,
+        messages=tuple(sim.messages),
+        cloth_mode=sim.cloth_mode,
+        vacuum_mode=sim.vacuum_mode,
+        feed_mode=sim.feed_mode,
+        cleaning_score=sim.cleaning_score,
+        combo_multiplier=sim.combo_multiplier,
+        sim_time=sim.clock.get_ticks(),
+        published_at=time.perf_counter(),
+    )
+
+
+class SnapshotBuffer:
+    """Two-slot buffer: the simulation fills the back slot while the renderer reads the front one."""
+    def __init__(self, initial=None):
+        self.slots = [initial, initial]
+        self.front = 0
+        self.sequence = 0
+        self.lock = threading.Lock()
+
+    def publish(self, snapshot):
+        """Store a new snapshot in the back slot and make it the front."""
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self.lock:
+            self.front = back
+            self.sequence += 1
+
+    def latest(self):
+        """Return the most recently published snapshot and its sequence number."""
+        with self.lock:
+            return self.slots[self.front], self.sequence
@@ -0,0 +1,121 @@
+from utils import WINDOW_WIDTH, ROOM_TOP, ROOM_BOTTOM, WALL_THICKNESS
+
+# Floor area inside the walls as (left, top, right, bottom)
+ROOM_BOUNDS = (WALL_THICKNESS, ROOM_TOP + WALL_THICKNESS,
+               WINDOW_WIDTH - WALL_THICKNESS, ROOM_BOTTOM - WALL_THICKNESS)
+
+
+class GridGeometry:
+    """Uniform grid of square cells over a rectangle, numbered row by row.
+
+    Positions outside the rectangle are clamped to the nearest edge cell, so
+    every point has a cell.
+    """
+    def __init__(self, bounds=ROOM_BOUNDS, cell_size=32):
+        self.left, self.top, right, bottom = bounds
+        self.cell_size = cell_size
+        self.cols = max(1, -(-(right - self.left) // cell_size))
+        self.rows = max(1, -(-(bottom - self.top) // cell_size))
+
+    def cell_coords(self, x, y):
+        """Return the (column, row) of the cell holding a position."""
+        col = int((x - self.left) // self.cell_size)
+        row = int((y - self.top) // self.cell_size)
+        return min(max(col, 0), self.cols - 1), min(max(row, 0), self.rows - 1)
+
+    def cell_index(self, x, y):
+        """Return the cell number for a position."""
+        col, row = self.cell_coords(x, y)
+        return row * self.cols + col
+
+    def cell_indices(self, xs, ys):
+        """Vectorized cell_index for NumPy coordinate arrays."""
+        cols = ((xs - self.left) // self.cell_size).clip(0, self.cols - 1)
+        rows = ((ys - self.top) // self.cell_size).clip(0, self.rows - 1)
+        return (rows * self.cols + cols).astype('int32')
+
+    def ring_cells(self, col, row, ring):
+        """Yield the cell numbers exactly ring cells away (Chebyshev distance) from a cell."""
+        if ring == 0:
+            yield row * self.cols + col
+            return
+        first_col, last_col = max(col - ring, 0), min(col + ring, self.cols - 1)
+        for edge in (row - ring, row + ring):
+            if 0 <= edge < self.rows:
+                for c in range(first_col, last_col + 1):
+                    yield edge * self.cols + c
+        for r in range(max(row - ring + 1, 0), min(row + ring, self.rows)):
+            for c in (col - ring, col + ring):
+                if 0 <= c < self.cols:
+                    yield r * self.cols + c
+
+    def row_spans(self, left, top, right, bottom):
+        """Yield (first, last) cell numbers of each row of cells overlapping a box."""
+        col0, row0 = self.cell_coords(left, top)
+        col1, row1 = self.cell_coords(right, bottom)
+        for row in range(row0, row1 + 1):
+            yield row * self.cols + col0, row * self.cols + col1
+
+
+class SpatialGrid(GridGeometry):
+    """Uniform-grid spatial hash of objects by position.
+
+    Supports insert/remove and nearest-item queries that only visit
+    the cells around the query.
+    """
+    def __init__(self, bounds=ROOM_BOUNDS, cell_size=64):
+        super().__init__(bounds, cell_size)
+        self.cells = {}      # cell number -> {item: (x, y)}
+        self.positions = {}  # item -> cell number
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def insert(self, item, x, y):
+        """Add an item at a position."""
+        cell = self.cell_index(x, y)
+        self.positions[item] = cell
+        self.cells.setdefault(cell, {})[item] = (x, y)
+
+    def remove(self, item):
+        """Remove an item if it is in the grid."""
+        cell = self.positions.pop(item, None)
+        if cell is not None:
+            bucket = self.cells[cell]
+            del bucket[item]
+            if not bucket:
+                del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def nearest(self, x, y, radius, skip=()):
+        """Return (distance squared, item) for the closest item within radius, or None.
+
+        Cells are searched in rings around the query's cell, stopping once no
+        unvisited cell can hold anything closer. Items in skip are ignored.
+        """
+        cells = self.cells
+        size = self.cell_size
+        col, row = self.cell_coords(x, y)
+        best = None
+        limit = radius * radius
+        for ring in range(min(int(radius // size) + 1, max(self.cols, self.rows)) + 1):
+            for cell in self.ring_cells(col, row, ring):
+                bucket = cells.get(cell)
+                if bucket:
+                    for item, (ix, iy) in bucket.items():
+                        dx = ix - x
+                        dy = iy - y
+                        distance = dx * dx + dy * dy
+                        if distance <= limit and item not in skip:
+                            best = (distance, item)
+                            limit = distance
+            # Everything in the next ring is at least ring cells away
+            if best is not None and best[0] <= (ring * size) ** 2:
+                break
+        return best
@@ -0,0 +1,112 @@
+import math
+import numpy as np
+import pygame
+
+ALPHA_STEPS = 32       # Fade levels pre-rendered for each sprite
+ROTATION_STEP = 5      # Degrees between pre-rendered seed rotations
+ROTATIONS = 360 // ROTATION_STEP
+SIZE_STEP = 0.25       # Pixel step for quantizing seed sizes
+POSE_KEY = (255, 0, 255)  # Transparent color of pose sprites; never painted by a pose
+
+# Unit offsets of a seed triangle's three corners at each pre-rendered rotation
+SEED_CORNERS = [
+    [(math.cos(math.radians(step * ROTATION_STEP + corner)), math.sin(math.radians(step * ROTATION_STEP + corner)))
+     for corner in (0, 120, 240)]
+    for step in range(ROTATIONS)
+]
+
+
+class SpriteCache:
+    """Sprites pre-rendered once: particles at a fixed set of alpha levels, and figure poses.
+
+    Each sprite shape is painted once, then copied into an alpha ramp, so
+    drawing a fading particle is a lookup instead of a new Surface.
+    """
+    def __init__(self, alpha_steps=ALPHA_STEPS):
+        self.alpha_steps = alpha_steps
+        self.ramps = {}
+        self.poses = {}  # Whole-figure sprites, such as pigeon poses
+
+    def level(self, alpha):
+        """Quantize an alpha value (0-255) to a ramp index."""
+        steps = self.alpha_steps - 1
+        return min(steps, max(0, int(alpha * steps / 255 + 0.5)))
+
+    def ramp(self, key, size, paint):
+        """Return the alpha ramp for key, painting it with paint(surface) on first use."""
+        ramp = self.ramps.get(key)
+        if ramp is None:
+            base = pygame.Surface(size, pygame.SRCALPHA)
+            paint(base)
+            converted = pygame.display.get_surface() is not None
+            ramp = []
+            for level in range(self.alpha_steps):
+                sprite = base.copy()
+                alpha = round(255 * level / (self.alpha_steps - 1))
+                sprite.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+                ramp.append(sprite.convert_alpha() if converted else sprite)
+            self.ramps[key] = ramp
+        return ramp
+
+    def circle(self, box, center, radius, color, alpha):
+        """A circle of radius at center inside a box-by-box sprite, or None if invisible."""
+        level = self.level(alpha)
+        if not level:
+            return None
+        key = ('circle', box, center, radius, color)
+        return self.ramp(key, (box, box), lambda s: pygame.draw.circle(s, color, (center, center), radius))[level]
+
+    def seed_batch(self, xs, ys, seed_sizes, rotations, color, alphas):
+        """(sprite, position) pairs centring seed sprites on world positions, for Surface.blits().
+
+        Sizes, rotations and alpha levels are quantized on whole arrays, so
+        each seed costs one ramp lookup; invisible seeds are left out.
+        """
+        sizes = np.round(seed_sizes / SIZE_STEP) * SIZE_STEP
+        steps = np.round(rotations / ROTATION_STEP).astype(np.int64) % ROTATIONS
+        top = self.alpha_steps - 1
+        levels = np.broadcast_to(np.clip((np.asarray(alphas) * top / 255 + 0.5).astype(np.int64), 0, top), xs.shape)
+        halves = (sizes * 2).astype(np.int64)
+        lefts = xs.astype(np.int64) - halves
+        uppers = ys.astype(np.int64) - halves
+        ramps = self.ramps
+        batch = []
+        for size, step, level, left, upper in zip(sizes.tolist(), steps.tolist(), levels.tolist(),
+                                                  lefts.tolist(), uppers.tolist()):
+            if level:
+                ramp = ramps.get(('seed', size, step, color)) or self.seed_ramp(size, step, color)
+                batch.append((ramp[level], (left, upper)))
+        return batch
+
+    def seed_ramp(self, size, step, color):
+        """The alpha ramp of a seed of quantized size at rotation step * ROTATION_STEP."""
+        def paint(surface):
+            half = size * 2
+            pygame.draw.polygon(surface, color, [(half + cos * size, half + sin * size)
+                                                 for cos, sin in SEED_CORNERS[step]])
+
+        return self.ramp(('seed', size, step, color), (size * 4, size * 4), paint)
+
+    def pose(self, key, size, paint):
+        """A single hard-edged sprite for key, painted with paint(surface) on first use.
+
+        Transparency is a run-length encoded colorkey rather than per-pixel
+        alpha, which blits several times faster for large opaque figures.
+        """
+        sprite = self.poses.get(key)
+        if sprite is None:
+            sprite = pygame.Surface(size)
+            sprite.fill(POSE_KEY)
+            paint(sprite)
+            sprite.set_colorkey(POSE_KEY, pygame.RLEACCEL)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self.poses[key] = sprite
+        return sprite
+
+    def clear(self):
+        self.ramps.clear()
+        self.poses.clear()
+
+
+sprite_cache = SpriteCache()
@@ -0,0 +1,238 @@
+import argparse
+import csv
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import numpy as np
+from events import EVENTS
+from flock import Flock
+from simulation import Simulation, InputState, NO_INPUT
+
+# Scripted player: how long each cleaning visit lasts, in simulation steps
+CLEAN_STEPS = 120
+PLAYER_PARAMS = ('feed_interval', 'clean_interval')  # Seconds between visits; 0 never visits
+EVENT_SUFFIX = '_rate'  # find_coin_rate etc. set an event's firings per second per pigeon; 0 never fires
+METRICS = ('starved_after', 'mess_per_hour', 'mean_happiness', 'final_hunger', 'cleaning_score')
+
+
+def tunable(name):
+    """Where a parameter lives: 'flock', 'sim', 'player' or 'event'."""
+    if name in PLAYER_PARAMS:
+        return 'player'
+    if name.endswith(EVENT_SUFFIX) and name[:-len(EVENT_SUFFIX)] in EVENTS:
+        return 'event'
+    if isinstance(getattr(Flock, name, None), (int, float)):
+        return 'flock'
+    if isinstance(getattr(Simulation, name, None), (int, float)):
+        return 'sim'
+    raise ValueError(f"{name} is not a tunable Flock or Simulation constant, event rate or player setting")
+
+
+def mess_spot(store):
+    """A position with mess on it: a stored point, or the middle of a folded cell."""
+    if store.count:
+        return store[0]
+    grid = store.grid
+    cell = int(np.flatnonzero(store.folded)[0])
+    return (grid.left + (cell % grid.cols + 0.5) * grid.cell_size,
+            grid.top + (cell // grid.cols + 0.5) * grid.cell_size)
+
+
+def player_input(sim, tick, steps_per_second, feed_interval, clean_interval):
+    """The scripted player's input for one tick.
+
+    Every feed_interval seconds it scatters seeds in front of the first
+    pigeon; every clean_interval seconds it spends CLEAN_STEPS steps
+    vacuuming dander and wiping droppings, one spot per step, which is
+    what builds cleaning combos.
+    """
+    clicks = []
+    mouse_pos, mouse_down = NO_INPUT.mouse_pos, False
+    # Intervals shorter than a step visit every step rather than never
+    if feed_interval and tick % max(1, round(feed_interval * steps_per_second)) == 0:
+        pigeon = sim.pigeon
+        clicks = [sim.feed_button.center, (pigeon.x, pigeon.y + 60)]
+    if clean_interval:
+        phase = tick % max(1, round(clean_interval * steps_per_second))
+        if phase < CLEAN_STEPS:
+            flock = sim.flock
+            tool, mess = ((sim.vacuum_button, flock.dander) if len(flock.dander)
+                          else (sim.cloth_button, flock.droppings))
+            if phase == CLEAN_STEPS - 1 or not len(mess):
+                # Put the tool down
+                if sim.vacuum_mode or sim.cloth_mode:
+                    clicks.append((sim.vacuum_button if sim.vacuum_mode else sim.cloth_button).center)
+            else:
+                if not (sim.vacuum_mode if tool is sim.vacuum_button else sim.cloth_mode):
+                    clicks.append(tool.center)
+                mouse_pos, mouse_down = mess_spot(mess), True
+    if clicks or mouse_down:
+        return InputState(mouse_pos, mouse_down, clicks)
+    return NO_INPUT
+
+
+def run_session(job):
+    """Run one headless session and return its summary row."""
+    index, params, seed, minutes, sim_rate, flock_size = job
+    sim = Simulation(flock_size=flock_size, seed=seed)
+    player = {name: 0 for name in PLAYER_PARAMS}
+    events = sim.events
+    for name, value in params.items():
+        where = tunable(name)
+        if where == 'player':
+            player[name] = value
+        elif where == 'event':
+            # A private copy of the table, so other sessions keep the default rates
+            if events.events is EVENTS:
+                events.events = dict(EVENTS)
+            event = name[:-len(EVENT_SUFFIX)]
+            events.events[event] = events.events[event]._replace(rate=value)
+        else:
+            setattr(sim.flock if where == 'flock' else sim, name, value)
+    if events.events is not EVENTS:
+        events.reset(sim.flock.pigeons)
+
+    dt = 1 / sim_rate
+    step = sim.step
+    flock = sim.flock
+    ticks = int(minutes * 60 * sim_rate)
+    starved_after = math.nan
+    happiness = 0.0
+    samples = 0
+    for tick in range(ticks):
+        if player['feed_interval'] or player['clean_interval']:
+            step(dt, player_input(sim, tick, sim_rate, **player))
+        else:
+            step(dt)
+        # Sample the stats once a simulated second
+        if tick % sim_rate == 0:
+            n = flock.count
+            happiness += float(flock.happiness[:n].mean())
+            samples += 1
+            if math.isnan(starved_after) and flock.hunger[:n].max() >= 100:
+                starved_after = tick / sim_rate
+
+    n = flock.count
+    return dict(
+        run=index,
+        seed=seed,
+        **params,
+        starved_after=starved_after,
+        mess_per_hour=(len(flock.dander) + len(flock.droppings)) / (minutes / 60),
+        mean_happiness=happiness / max(1, samples),
+        final_hunger=float(flock.hunger[:n].mean()),
+        cleaning_score=sim.cleaning_score,
+    )
+
+
+def parameter_grid(specs):
+    """Every combination of 'name=v1,v2,...' specs, as a list of {name: value} dicts."""
+    names = []
+    values = []
+    for spec in specs:
+        name, _, options = spec.partition('=')
+        tunable(name)
+        names.append(name)
+        values.append([float(option) for option in options.split(',')])
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def make_jobs(grid, runs, seed, minutes, sim_rate, flock_size):
+    """One job per grid point and repetition; run i always gets seed + i."""
+    jobs = []
+    for params in grid:
+        for _ in range(runs):
+            index = len(jobs)
+            jobs.append((index, params, seed + index, minutes, sim_rate, flock_size))
+    return jobs
+
+
+def sweep(jobs, workers=None, on_result=None):
+    """Run jobs across a process pool, one worker per core by default.
+
+    Rows are passed to on_result as they finish and returned in run order.
+    """
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_session, job) for job in jobs]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            if on_result:
+                on_result(row)
+    rows.sort(key=lambda row: row['run'])
+    return rows
+
+
+def summarize(rows, names):
+    """Mean of each metric per grid point; starved_after averages only the runs that starved."""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(row[name] for name in names), []).append(row)
+    table = []
+    for key, group in groups.items():
+        summary = dict(zip(names, key), runs=len(group))
+        for metric in METRICS:
+            values = np.array([row[metric] for row in group], dtype=np.float64)
+            summary[metric] = float(np.nanmean(values)) if not np.isnan(values).all() else math.nan
+        summary['starved'] = int(np.count_nonzero(~np.isnan([row['starved_after'] for row in group])))
+        table.append(summary)
+    return table
+
+
+def print_table(table, names):
+    columns = list(names) + ['runs', 'starved'] + list(METRICS)
+    print("".join(f"{column:>16}" for column in columns))
+    for summary in table:
+        print("".join(f"{summary[column]:>16.4g}" for column in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run headless sessions over a grid of tuning constants")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="values to try for a Flock or Simulation constant, an event's <name>_rate "
+                             "per second, or the scripted player's feed_interval/clean_interval "
+                             "in seconds (repeatable)")
+    parser.add_argument("--runs", type=int, default=10, help="sessions per grid point (default: 10)")
+    parser.add_argument("--minutes", type=float, default=60, help="simulated minutes per session (default: 60)")
+    parser.add_argument("--sim-rate", type=int, default=60, help="simulation steps per second (default: 60)")
+    parser.add_argument("--pigeons", type=int, default=1, help="pigeons per session (default: 1)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first run; run i uses seed + i")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    parser.add_argument("-o", "--output", help="write each run's row to this CSV file as it finishes")
+    args = parser.parse_args(argv)
+
+    grid = parameter_grid(args.param)
+    names = list(grid[0])
+    jobs = make_jobs(grid, args.runs, args.seed, args.minutes, args.sim_rate, args.pigeons)
+    output = open(args.output, 'w', newline='') if args.output else None
+    if output:
+        writer = csv.DictWriter(output, fieldnames=['run', 'seed'] + names + list(METRICS))
+        writer.writeheader()
+    start = time.perf_counter()
+    done = 0
+
+    def on_result(row):
+        nonlocal done
+        done += 1
+        if output:
+            writer.writerow(row)
+        print(f"\r{done}/{len(jobs)} runs", end="", file=sys.stderr, flush=True)
+
+    try:
+        rows = sweep(jobs, args.workers, on_result)
+    finally:
+        if output:
+            output.close()
+    print(f"\r{len(jobs)} runs in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    print_table(summarize(rows, names), names)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import io
+import os
+from collections import OrderedDict
+import pygame
+
+DEFAULT_SIZE = 24
+
+_fonts = {}
+_default_font_data = None  # pygame's bundled font file, read once for every size
+DEFAULT_FONT_SCALE = 0.6875  # pygame shrinks its default font by this when loaded with Font(None, size)
+
+
+def default_font_data():
+    global _default_font_data
+    if _default_font_data is None:
+        path = os.path.join(os.path.dirname(pygame.font.__file__), pygame.font.get_default_font())
+        with open(path, 'rb') as f:
+            _default_font_data = f.read()
+    return _default_font_data
+
+
+def get_font(size=DEFAULT_SIZE, face=None):
+    """Return the Font for (face, size), loading it only the first time.
+
+    face is a font file path, or None for pygame's bundled default font.
+    """
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        if face is None:
+            font = pygame.font.Font(io.BytesIO(default_font_data()), max(1, int(size * DEFAULT_FONT_SCALE)))
+        else:
+            font = pygame.font.Font(face, size)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """Bounded LRU cache of rendered text surfaces."""
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, text, size=DEFAULT_SIZE, color=(0, 0, 0), antialias=True, face=None):
+        """Return a surface with the rendered text, reusing an earlier render when possible."""
+        key = (text, size, color, antialias, face)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = self.surfaces[key] = get_font(size, face).render(text, antialias, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+            self.evictions += 1
+        return surface
+
+    def stats(self):
+        """Counters for checking that steady-state frames render no new text."""
+        return {
+            'entries': len(self.surfaces),
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+text_cache = TextCache()
+
+
+def render_text(text, size=DEFAULT_SIZE, color=(0, 0, 0), antialias=True, face=None):
+    """Render text through the shared cache."""
+    return text_cache.render(text, size, color, antialias, face)
@@ -1,4 +1,5 @@
 import pygame
+from text import render_text
 
 # Colors
 FLOOR_COLOR = (210, 180, 140)
@@ -10,6 +11,35 @@ DROPPING_COLOR = (139, 69, 19)
 SEED_COLOR = (218, 165, 32)
 VACUUM_COLOR = (100, 100, 100)
 
+# Per-step amounts in the simulation are tuned for this many steps per second and scaled by dt
+BASE_RATE = 60
+
+# Room layout
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 700  # Increased to accommodate UI
+ROOM_TOP = 80       # Room starts below status bars
+ROOM_BOTTOM = 600   # Room ends above buttons
+WALL_THICKNESS = 20
+
+STATUS_BAR_WIDTH = 200
+STATUS_AREA = (0, 0, WINDOW_WIDTH, 45)  # Everything draw_status_bars paints, labels included
+
+def status_values(pigeon):
+    """Percentages shown in the status bars."""
+    # Calculate hygiene based on mess
+    total_mess = len(pigeon.dander) + len(pigeon.droppings)
+    hygiene = max(0, 100 - (total_mess * 2))  # Each mess reduces hygiene by 2%
+
+    return {
+        'hygiene': hygiene,
+        'hunger': 100 - pigeon.hunger,  # Invert hunger so full bar means not hungry
+        'happiness': pigeon.happiness
+    }
+
+def status_fill_widths(pigeon):
+    """Filled pixel width of each status bar; the bars look the same while these do."""
+    return tuple(int(STATUS_BAR_WIDTH * (value / 100)) for value in status_values(pigeon).values())
+
 def draw_status_bars(screen, pigeon):
     """Draw status bars at the top of the screen."""
     colors = {
@@ -18,22 +48,14 @@ def draw_status_bars(screen, pigeon):
         'happiness': (255, 215, 0)    # Gold
     }
 
-    bar_width = 200
+    bar_width = STATUS_BAR_WIDTH
     bar_height = 20
     bar_spacing = 50
     total_width = (bar_width * 3) + (bar_spacing * 2)
     start_x = (screen.get_width() - total_width) // 2
     start_y = 20  # Fixed position at top
 
-    # Calculate hygiene based on mess
-    total_mess = len(pigeon.dander) + len(pigeon.droppings)
-    hygiene = max(0, 100 - (total_mess * 2))  # Each mess reduces hygiene by 2%
-
-    values = {
-        'hygiene': hygiene,
-        'hunger': 100 - pigeon.hunger,  # Invert hunger so full bar means not hungry
-        'happiness': pigeon.happiness
-    }
+    values = status_values(pigeon)
 
     for i, (stat_name, color) in enumerate(colors.items()):
         x = start_x + (bar_width + bar_spacing) * i
@@ -48,8 +70,7 @@ def draw_status_bars(screen, pigeon):
         pygame.draw.rect(screen, BLACK, 
                         (x, start_y, bar_width, bar_height), 2)
         # Draw label
-        font = pygame.font.Font(None, 24)
-        text = font.render(stat_name.capitalize(), True, BLACK)
+        text = render_text(stat_name.capitalize(), 24, BLACK)
         text_rect = text.get_rect(centerx=x + bar_width//2, top=start_y - 25)
         screen.blit(text, text_rect)
 
@@ -101,9 +122,8 @@ def draw_room(surface, width, height, wall_thickness, room_top):
 
 def display_messages(screen, messages, max_messages=5):
     """Display game messages on screen."""
-    font = pygame.font.Font(None, 24)
     for i, message in enumerate(messages[-max_messages:]):
-        text = font.render(message, True, (255, 255, 255))
+        text = render_text(message, 24, (255, 255, 255))
         screen.blit(text, (10, 500 + i * 20))
 
 def update_combo(last_clean_time, current_time, combo_multiplier):